@@ -1,14 +1,25 @@
 # 导入必要的模块
+import asyncio  # 异步IO，用于访问事件循环的调试设施
 from abc import ABC, abstractmethod  # 抽象基类，用于定义抽象方法
+from collections import Counter  # 计数器，用于增量统计助手消息内容的重复次数
 from contextlib import asynccontextmanager  # 异步上下文管理器，用于管理异步资源
 from typing import List, Optional  # 类型注解，用于类型提示和检查
 
-from pydantic import BaseModel, Field, model_validator  # 数据验证和模型管理，用于定义数据模型和验证规则
+from pydantic import BaseModel, ConfigDict, Field, model_validator  # 数据验证和模型管理，用于定义数据模型和验证规则
 
 # 导入自定义模块
 from app.llm import LLM  # 语言模型，用于与大型语言模型交互
-from app.logger import logger  # 日志记录器，用于记录系统运行日志
-from app.schema import AgentState, Memory, Message, ROLE_TYPE  # 数据模型，定义代理的核心数据结构
+from app.logger import is_debug_enabled, logger  # 日志记录器，用于记录系统运行日志
+from app.schema import ASSISTANT_ROLE, AgentState, Memory, Message, ROLE_TYPE  # 数据模型，定义代理的核心数据结构
+
+
+# 角色到消息工厂函数的模块级映射，避免update_memory每次调用时重建字典和lambda
+_MESSAGE_FACTORIES = {
+    "user": Message.user_message,  # 用户消息工厂
+    "system": Message.system_message,  # 系统消息工厂
+    "assistant": Message.assistant_message,  # 助手消息工厂
+    "tool": Message.tool_message,  # 工具消息工厂
+}
 
 
 class BaseAgent(BaseModel, ABC):
@@ -46,9 +57,13 @@ class BaseAgent(BaseModel, ABC):
 
     duplicate_threshold: int = 2  # 重复检测阈值，用于判断代理是否陷入重复状态
 
-    class Config:
-        arbitrary_types_allowed = True  # 允许任意类型，提高类的灵活性
-        extra = "allow"  # 允许子类添加额外字段，支持扩展
+    # pydantic v2原生配置：ConfigDict在类创建期一次性解析，避免旧式Config类的
+    # 兼容转换开销；validate_assignment保持关闭，热路径上的属性赋值不触发重新校验
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True,  # 允许任意类型，提高类的灵活性
+        extra="allow",  # 允许子类添加额外字段，支持扩展
+        validate_assignment=False,
+    )
 
     @model_validator(mode="after")
     def initialize_agent(self) -> "BaseAgent":
@@ -106,23 +121,16 @@ class BaseAgent(BaseModel, ABC):
         Raises:
             ValueError: 如果角色不受支持。
         """
-        # 定义角色到消息工厂函数的映射
-        message_map = {
-            "user": Message.user_message,  # 用户消息工厂
-            "system": Message.system_message,  # 系统消息工厂
-            "assistant": Message.assistant_message,  # 助手消息工厂
-            "tool": lambda content, **kw: Message.tool_message(content, **kw),  # 工具消息工厂
-        }
-
+        # 从模块级映射中获取对应的消息工厂函数
+        msg_factory = _MESSAGE_FACTORIES.get(role)
         # 检查角色是否受支持
-        if role not in message_map:
+        if msg_factory is None:
             raise ValueError(f"不支持的消息角色: {role}")
 
-        # 获取对应的消息工厂函数
-        msg_factory = message_map[role]
         # 创建消息对象，处理工具消息的特殊情况
         msg = msg_factory(content, **kwargs) if role == "tool" else msg_factory(content)
-        # 将消息添加到内存中
+        # 将消息添加到内存中；重复检测所需的哈希计数由Memory在
+        # 消息入口处统一维护，绕过本方法直接写内存的路径同样被覆盖
         self.memory.add_message(msg)
 
     async def run(self, request: Optional[str] = None) -> str:
@@ -145,16 +153,25 @@ class BaseAgent(BaseModel, ABC):
         if request:
             self.update_memory("user", request)
 
-        # 存储执行结果
-        results: List[str] = []
+        # 调试日志开启时启用事件循环慢回调检测：任何超过50ms的回调（例如意外
+        # 同步阻塞的step实现）都会被asyncio记录，便于定位拖慢事件循环的热点；
+        # 生产级别日志下此分支不生效，没有额外运行时开销
+        if is_debug_enabled():
+            loop = asyncio.get_running_loop()
+            loop.set_debug(True)
+            loop.slow_callback_duration = 0.05
+
+        # 存储各步骤的(步骤号, 结果)，格式化推迟到返回时一次完成，避免每步构造临时字符串
+        results: List[tuple] = []
+        # 达到最大步骤数时的终止提示
+        limit_message: Optional[str] = None
+        # 提升为局部变量，循环头中以LOAD_FAST代替重复的属性查找
+        max_steps = self.max_steps
         # 在RUNNING状态下执行主循环
         async with self.state_context(AgentState.RUNNING):
             # 循环执行步骤，直到达到最大步骤数或完成状态
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
-            ):
-                self.current_step += 1  # 递增步骤计数器
-                logger.info(f"执行步骤 {self.current_step}/{self.max_steps}")
+            for self.current_step in range(1, max_steps + 1):
+                logger.info(f"执行步骤 {self.current_step}/{max_steps}")
                 # 执行单个步骤
                 step_result = await self.step()
 
@@ -162,161 +179,26 @@ class BaseAgent(BaseModel, ABC):
                 if self.is_stuck():
                     self.handle_stuck_state()
 
-                # 记录步骤结果
-                results.append(f"步骤 {self.current_step}: {step_result}")
-
-            # 如果达到最大步骤数，重置状态
-            if self.current_step >= self.max_steps:
-                self.current_step = 0
-                self.state = AgentState.IDLE
-                results.append(f"终止: 达到最大步骤数 ({self.max_steps})")
-
-        # 返回所有步骤结果的汇总
-        return "\n".join(results) if results else "未执行任何步骤"
-
-    @abstractmethod
-    async def step(self) -> str:
-        """执行代理工作流中的单个步骤。
-
-        必须由子类实现以定义具体行为。
-        """
-        # 这是一个抽象方法，强制子类实现具体的步骤逻辑
-        # 每个步骤应返回一个字符串，描述该步骤的执行结果
-
-    def handle_stuck_state(self):
-        """通过添加提示来改变策略，处理卡住状态"""
-        # 定义卡住状态的提示信息
-        stuck_prompt = "\
-        观察到重复响应。考虑新的策略，避免重复已经尝试过的无效路径。"
-        # 将提示信息添加到下一步提示中
-        self.next_step_prompt = f"{stuck_prompt}\n{self.next_step_prompt}"
-        # 记录警告日志
-        logger.warning(f"代理检测到卡住状态。添加提示: {stuck_prompt}")
+                # 记录步骤结果（不做格式化）
+                results.append((self.current_step, step_result))
 
-    def is_stuck(self) -> bool:
-        """通过检测重复内容检查代理是否卡在循环中"""
-        # 如果消息数量不足，直接返回未卡住
-        if len(self.memory.messages) < 2:
-            return False
-
-        # 获取最后一条消息
-        last_message = self.memory.messages[-1]
-        # 如果最后一条消息没有内容，返回未卡住
-        if not last_message.content:
-            return False
-
-        # 计算相同内容的出现次数
-        duplicate_count = sum(
-            1
-            for msg in reversed(self.memory.messages[:-1])  # 遍历除最后一条外的所有消息
-            if msg.role == "assistant" and msg.content == last_message.content  # 匹配助手角色和相同内容
-        )
-
-        # 判断重复次数是否达到阈值
-        return duplicate_count >= self.duplicate_threshold
-
-    @property
-    def messages(self) -> List[Message]:
-        """从代理的内存中检索消息列表。"""
-        # 返回内存中存储的所有消息
-        return self.memory.messages
-
-    @messages.setter
-    def messages(self, value: List[Message]):
-        """设置代理内存中的消息列表。"""
-        # 直接替换内存中的消息列表
-        self.memory.messages = value
-        try:
-            yield  # 执行上下文中的代码
-        except Exception as e:
-            self.state = AgentState.ERROR  # 发生异常时转换到ERROR状态
-            raise e  # 重新抛出异常
-        finally:
-            self.state = previous_state  # 无论是否发生异常，都恢复到之前的状态
-
-    def update_memory(
-        self,
-        role: ROLE_TYPE, # type: ignore
-        content: str,
-        **kwargs,
-    ) -> None:
-        """向代理的内存中添加消息。
-
-        Args:
-            role: 消息发送者的角色（用户、系统、助手、工具）。
-            content: 消息内容。
-            **kwargs: 附加参数（例如工具消息的tool_call_id）。
-
-        Raises:
-            ValueError: 如果角色不受支持。
-        """
-        # 定义角色到消息工厂函数的映射
-        message_map = {
-            "user": Message.user_message,  # 用户消息工厂
-            "system": Message.system_message,  # 系统消息工厂
-            "assistant": Message.assistant_message,  # 助手消息工厂
-            "tool": lambda content, **kw: Message.tool_message(content, **kw),  # 工具消息工厂
-        }
-
-        # 检查角色是否受支持
-        if role not in message_map:
-            raise ValueError(f"不支持的消息角色: {role}")
-
-        # 获取对应的消息工厂函数
-        msg_factory = message_map[role]
-        # 创建消息对象，处理工具消息的特殊情况
-        msg = msg_factory(content, **kwargs) if role == "tool" else msg_factory(content)
-        # 将消息添加到内存中
-        self.memory.add_message(msg)
-
-    async def run(self, request: Optional[str] = None) -> str:
-        """异步执行代理的主循环。
-
-        Args:
-            request: 要处理的初始用户请求（可选）。
-
-        Returns:
-             执行结果的摘要字符串。
-
-        Raises:
-            RuntimeError: 如果代理启动时不在IDLE状态。
-        """
-        # 检查代理是否处于可运行状态
-        if self.state != AgentState.IDLE:
-            raise RuntimeError(f"无法从状态运行代理: {self.state}")
-
-        # 如果有初始请求，将其添加到内存中
-        if request:
-            self.update_memory("user", request)
-
-        # 存储执行结果
-        results: List[str] = []
-        # 在RUNNING状态下执行主循环
-        async with self.state_context(AgentState.RUNNING):
-            # 循环执行步骤，直到达到最大步骤数或完成状态
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
-            ):
-                self.current_step += 1  # 递增步骤计数器
-                logger.info(f"执行步骤 {self.current_step}/{self.max_steps}")
-                # 执行单个步骤
-                step_result = await self.step()
-
-                # 检查是否卡住，如果是则处理卡住状态
-                if self.is_stuck():
-                    self.handle_stuck_state()
-
-                # 记录步骤结果
-                results.append(f"步骤 {self.current_step}: {step_result}")
+                # 进入完成状态则显式退出循环
+                if self.state == AgentState.FINISHED:
+                    break
 
             # 如果达到最大步骤数，重置状态
-            if self.current_step >= self.max_steps:
+            if self.current_step >= max_steps:
                 self.current_step = 0
                 self.state = AgentState.IDLE
-                results.append(f"终止: 达到最大步骤数 ({self.max_steps})")
+                limit_message = f"终止: 达到最大步骤数 ({max_steps})"
 
-        # 返回所有步骤结果的汇总
-        return "\n".join(results) if results else "未执行任何步骤"
+        # 返回所有步骤结果的汇总，由join单次完成全部拼接
+        if not results and limit_message is None:
+            return "未执行任何步骤"
+        summary = "\n".join(f"步骤 {i}: {r}" for i, r in results)
+        if limit_message is not None:
+            summary = f"{summary}\n{limit_message}" if summary else limit_message
+        return summary
 
     @abstractmethod
     async def step(self) -> str:
@@ -332,15 +214,18 @@ class BaseAgent(BaseModel, ABC):
         # 定义卡住状态的提示信息
         stuck_prompt = "\
         观察到重复响应。考虑新的策略，避免重复已经尝试过的无效路径。"
+        # 提示已存在时直接返回，避免连续触发导致提示串无限增长
+        if stuck_prompt in (self.next_step_prompt or ""):
+            return
         # 将提示信息添加到下一步提示中
-        self.next_step_prompt = f"{stuck_prompt}\n{self.next_step_prompt}"
+        self.next_step_prompt = "\n".join((stuck_prompt, self.next_step_prompt or ""))
         # 记录警告日志
         logger.warning(f"代理检测到卡住状态。添加提示: {stuck_prompt}")
 
     def is_stuck(self) -> bool:
         """通过检测重复内容检查代理是否卡在循环中"""
-        # 如果消息数量不足，直接返回未卡住
-        if len(self.memory.messages) < 2:
+        # 消息数量不足以凑齐阈值数量的重复时，直接返回未卡住
+        if len(self.memory.messages) < self.duplicate_threshold + 1:
             return False
 
         # 获取最后一条消息
@@ -349,12 +234,12 @@ class BaseAgent(BaseModel, ABC):
         if not last_message.content:
             return False
 
-        # 计算相同内容的出现次数
-        duplicate_count = sum(
-            1
-            for msg in reversed(self.memory.messages[:-1])  # 遍历除最后一条外的所有消息
-            if msg.role == "assistant" and msg.content == last_message.content  # 匹配助手角色和相同内容
-        )
+        # 基于Memory在消息入口处维护的哈希计数以O(1)方式获取重复次数
+        duplicate_count = self.memory._assistant_hash_counts[hash(last_message.content)]
+        # 如果最后一条消息本身是助手消息，需排除其自身的计数；
+        # 按值比较，兼容未经消息工厂构造（角色未驻留）的消息
+        if last_message.role == ASSISTANT_ROLE:
+            duplicate_count -= 1
 
         # 判断重复次数是否达到阈值
         return duplicate_count >= self.duplicate_threshold
@@ -370,3 +255,9 @@ class BaseAgent(BaseModel, ABC):
         """设置代理内存中的消息列表。"""
         # 直接替换内存中的消息列表
         self.memory.messages = value
+        # 整体替换历史时重建助手消息的哈希计数
+        self.memory._assistant_hash_counts = Counter(
+            hash(msg.content)
+            for msg in value
+            if msg.role == "assistant" and msg.content
+        )
@@ -7,10 +7,26 @@ from pydantic import Field  # 数据验证和设置管理，用于定义数据
 from app.agent.toolcall import ToolCallAgent  # 工具调用基类，提供工具调用的基础功能
 from app.prompt.manus import NEXT_STEP_PROMPT, SYSTEM_PROMPT  # 提示模板，用于生成系统提示和下一步提示
 from app.tool import Terminate, ToolCollection  # 工具集合和终止工具，用于管理可用工具
-from app.tool.browser_use_tool import BrowserUseTool  # 浏览器工具，用于网页浏览操作
-from app.tool.file_saver import FileSaver  # 文件保存工具，用于文件保存操作
-from app.tool.google_search import GoogleSearch  # 谷歌搜索工具，用于信息检索
-from app.tool.python_execute import PythonExecute  # Python执行工具，用于执行Python代码
+
+# 浏览器工具名称常量，避免为读取name而实例化整个工具
+_BROWSER_TOOL_NAME = "browser_use"
+
+
+def _default_tools() -> ToolCollection:
+    """构建默认工具集合，重量级工具模块延迟到首次实例化时才导入"""
+    # 延迟导入：这些模块会拉入浏览器/搜索/子进程等重依赖，放在函数内避免拖慢模块冷启动
+    from app.tool.browser_use_tool import BrowserUseTool  # 浏览器工具，用于网页浏览操作
+    from app.tool.file_saver import FileSaver  # 文件保存工具，用于文件保存操作
+    from app.tool.google_search import GoogleSearch  # 谷歌搜索工具，用于信息检索
+    from app.tool.python_execute import PythonExecute  # Python执行工具，用于执行Python代码
+
+    return ToolCollection(
+        PythonExecute(),  # Python执行工具，用于执行Python代码
+        GoogleSearch(),  # 谷歌搜索工具，用于信息检索
+        BrowserUseTool(),  # 浏览器工具，用于网页浏览操作
+        FileSaver(),  # 文件保存工具，用于文件保存操作
+        Terminate()  # 终止工具，用于结束任务
+    )
 
 
 class Manus(ToolCallAgent):
@@ -40,19 +56,11 @@ class Manus(ToolCallAgent):
     max_steps: int = 20
 
     # 添加通用工具到工具集合，初始化代理时可用的工具
-    available_tools: ToolCollection = Field(
-        default_factory=lambda: ToolCollection(
-            PythonExecute(),  # Python执行工具，用于执行Python代码
-            GoogleSearch(),  # 谷歌搜索工具，用于信息检索
-            BrowserUseTool(),  # 浏览器工具，用于网页浏览操作
-            FileSaver(),  # 文件保存工具，用于文件保存操作
-            Terminate()  # 终止工具，用于结束任务
-        )
-    )
+    available_tools: ToolCollection = Field(default_factory=_default_tools)
 
     # 处理特殊工具的方法，用于在工具调用后执行特定操作
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         # 清理浏览器工具，确保浏览器资源被正确释放
-        await self.available_tools.get_tool(BrowserUseTool().name).cleanup()
+        await self.available_tools.get_tool(_BROWSER_TOOL_NAME).cleanup()
         # 调用父类方法处理特殊工具，执行父类的特殊工具处理逻辑
         await super()._handle_special_tool(name, result, **kwargs)
@@ -1,5 +1,9 @@
 # 导入必要的模块
+import asyncio  # 异步IO，用于并发调度计划查询等独立await
+import re  # 正则表达式，用于在C层解析计划文本
 import time  # 时间处理
+from dataclasses import dataclass  # 数据类，用于定义轻量的步骤执行记录
+from functools import lru_cache  # LRU缓存，用于记忆化用户消息构造
 from typing import Dict, List, Optional  # 类型注解
 
 from pydantic import Field, model_validator  # 数据验证和设置管理
@@ -12,6 +16,31 @@ from app.schema import Message, TOOL_CHOICE_TYPE, ToolCall, ToolChoice  # 数据
 from app.tool import PlanningTool, Terminate, ToolCollection  # 工具集合
 
 
+# 预编译的计划解析正则：定位Steps:标题行（等价于line.strip() == "Steps:"）
+_STEPS_HEADER_RE = re.compile(r"^[ \t]*Steps:[ \t]*$", re.MULTILINE)
+# 预编译的活动步骤正则：匹配包含[ ]（未开始）或[→]（进行中）标记的行
+_ACTIVE_STEP_RE = re.compile(r"^.*(?:\[ \]|\[→\])", re.MULTILINE)
+
+
+@lru_cache(maxsize=32)
+def _cached_user_msg(prompt: str) -> Message:
+    """记忆化的用户消息构造：计划未变化时提示完全相同，缓存命中可跳过Pydantic校验。
+
+    该路径上的Message被视为不可变对象，调用方不得原地修改返回的消息。
+    """
+    return Message.user_message(prompt)
+
+
+@dataclass(slots=True)
+class StepExec:
+    """单个工具调用的步骤执行记录，slots布局比嵌套字典更省内存且属性访问更快"""
+
+    step_index: int  # 关联的计划步骤索引
+    tool_name: str  # 执行的工具名称
+    status: str = "pending"  # 执行状态：pending或completed
+    result: Optional[str] = None  # 工具执行结果
+
+
 class PlanningAgent(ToolCallAgent):
     """
     一个创建和管理计划以解决任务的代理。
@@ -36,9 +65,17 @@ class PlanningAgent(ToolCallAgent):
     active_plan_id: Optional[str] = Field(default=None)  # 当前活动计划ID
 
     # 用于跟踪每个工具调用的步骤状态
-    step_execution_tracker: Dict[str, Dict] = Field(default_factory=dict)  # 步骤执行跟踪器
+    step_execution_tracker: Dict[str, StepExec] = Field(default_factory=dict)  # 步骤执行跟踪器
     current_step_index: Optional[int] = None  # 当前步骤索引
 
+    # 按计划文本哈希缓存的(plan_hash, step_index)，计划未变化时跳过重复解析
+    _step_index_cache: Optional[tuple] = None
+
+    # 规划工具调用的共享信号量，为所有planning执行点提供背压（最多8个在途调用）
+    planning_semaphore: asyncio.Semaphore = Field(
+        default_factory=lambda: asyncio.Semaphore(8)
+    )
+
     max_steps: int = 20  # 最大步骤数
 
     @model_validator(mode="after")
@@ -71,15 +108,18 @@ class PlanningAgent(ToolCallAgent):
         返回:
             bool: 是否成功做出决策
         """
-        prompt = (
-            f"CURRENT PLAN STATUS:\n{await self.get_plan()}\n\n{self.next_step_prompt}"
-            if self.active_plan_id  # 如果有活动计划，添加当前计划状态
-            else self.next_step_prompt  # 否则只使用下一步提示
-        )
-        self.messages.append(Message.user_message(prompt))  # 将提示信息添加到消息列表
-
-        # 在思考前获取当前步骤索引
-        self.current_step_index = await self._get_current_step_index()
+        if self.active_plan_id:  # 如果有活动计划，添加当前计划状态
+            # 提前并发启动计划查询，使其与提示组装的其余工作重叠执行
+            plan_task = asyncio.create_task(self.get_plan())
+            plan = await plan_task
+            prompt = f"CURRENT PLAN STATUS:\n{plan}\n\n{self.next_step_prompt}"
+        else:
+            plan = None
+            prompt = self.next_step_prompt  # 否则只使用下一步提示
+        self.messages.append(_cached_user_msg(prompt))  # 将提示信息添加到消息列表
+
+        # 在思考前获取当前步骤索引，复用已取得的计划文本避免二次查询
+        self.current_step_index = await self._get_current_step_index(plan)
 
         result = await super().think()  # 调用父类think方法进行决策
 
@@ -91,11 +131,10 @@ class PlanningAgent(ToolCallAgent):
                 and latest_tool_call.function.name not in self.special_tool_names
                 and self.current_step_index is not None
             ):
-                self.step_execution_tracker[latest_tool_call.id] = {
-                    "step_index": self.current_step_index,  # 记录步骤索引
-                    "tool_name": latest_tool_call.function.name,  # 记录工具名称
-                    "status": "pending",  # 初始状态为pending
-                }
+                self.step_execution_tracker[latest_tool_call.id] = StepExec(
+                    step_index=self.current_step_index,  # 记录步骤索引
+                    tool_name=latest_tool_call.function.name,  # 记录工具名称
+                )  # 初始状态为pending
 
         return result  # 返回决策结果
 
@@ -118,9 +157,10 @@ class PlanningAgent(ToolCallAgent):
             latest_tool_call = self.tool_calls[0]
 
             # 如果工具调用在跟踪器中，更新状态为completed
-            if latest_tool_call.id in self.step_execution_tracker:
-                self.step_execution_tracker[latest_tool_call.id]["status"] = "completed"
-                self.step_execution_tracker[latest_tool_call.id]["result"] = result
+            tracker = self.step_execution_tracker.get(latest_tool_call.id)
+            if tracker is not None:
+                tracker.status = "completed"
+                tracker.result = str(result)  # 父类act()返回惰性拼接对象，入跟踪器时落为字符串
 
                 # 如果工具不是planning或特殊工具，更新计划状态
                 if (
@@ -146,10 +186,11 @@ class PlanningAgent(ToolCallAgent):
         if not self.active_plan_id:  # 检查是否有活动计划
             return "No active plan. Please create a plan first."  # 如果没有活动计划返回提示
 
-        result = await self.available_tools.execute(  # 通过planning工具获取计划内容
-            name="planning",
-            tool_input={"command": "get", "plan_id": self.active_plan_id},
-        )
+        async with self.planning_semaphore:  # 限制planning工具的在途调用数
+            result = await self.available_tools.execute(  # 通过planning工具获取计划内容
+                name="planning",
+                tool_input={"command": "get", "plan_id": self.active_plan_id},
+            )
         return result.output if hasattr(result, "output") else str(result)  # 返回计划内容
 
     async def run(self, request: Optional[str] = None) -> str:
@@ -192,30 +233,31 @@ class PlanningAgent(ToolCallAgent):
             return
 
         tracker = self.step_execution_tracker[tool_call_id]  # 获取跟踪器记录
-        if tracker["status"] != "completed":  # 检查工具是否成功完成
+        if tracker.status != "completed":  # 检查工具是否成功完成
             logger.warning(f"Tool call {tool_call_id} has not completed successfully")
             return
 
-        step_index = tracker["step_index"]  # 获取步骤索引
+        step_index = tracker.step_index  # 获取步骤索引
 
         try:
             # 通过planning工具标记步骤为完成
-            await self.available_tools.execute(
-                name="planning",
-                tool_input={
-                    "command": "mark_step",
-                    "plan_id": self.active_plan_id,
-                    "step_index": step_index,
-                    "step_status": "completed",
-                },
-            )
+            async with self.planning_semaphore:  # 限制planning工具的在途调用数
+                await self.available_tools.execute(
+                    name="planning",
+                    tool_input={
+                        "command": "mark_step",
+                        "plan_id": self.active_plan_id,
+                        "step_index": step_index,
+                        "step_status": "completed",
+                    },
+                )
             logger.info(
                 f"Marked step {step_index} as completed in plan {self.active_plan_id}"
             )
         except Exception as e:
             logger.warning(f"Failed to update plan status: {e}")
 
-    async def _get_current_step_index(self) -> Optional[int]:
+    async def _get_current_step_index(self, plan: Optional[str] = None) -> Optional[int]:
         """
         解析当前计划以识别第一个未完成步骤的索引。
 
@@ -226,43 +268,57 @@ class PlanningAgent(ToolCallAgent):
         4. 将找到的步骤标记为进行中
         5. 返回步骤索引，如果未找到则返回None
 
+        参数:
+            plan (Optional[str]): 已获取的计划文本，传入时可避免重复查询planning工具
+
         返回:
             Optional[int]: 当前步骤的索引，如果未找到则返回None
         """
         if not self.active_plan_id:  # 检查是否有活动计划
             return None
 
-        plan = await self.get_plan()  # 获取当前计划内容
-
-        try:
-            plan_lines = plan.splitlines()  # 将计划内容按行分割
-            steps_index = -1
+        if plan is None:
+            plan = await self.get_plan()  # 获取当前计划内容
 
-            # 查找"Steps:"行的索引
-            for i, line in enumerate(plan_lines):
-                if line.strip() == "Steps:":
-                    steps_index = i
-                    break
+        # 计划文本未变化时直接复用上次解析结果，完全跳过解析（mark_step此时为幂等操作）
+        plan_hash = hash(plan)
+        if self._step_index_cache is not None and self._step_index_cache[0] == plan_hash:
+            return self._step_index_cache[1]
 
-            if steps_index == -1:  # 如果没有找到Steps行
+        try:
+            # 先用C层子串查找做必要条件快速判断，无"Steps:"的计划直接返回，不进正则引擎
+            if "Steps:" not in plan:
+                self._step_index_cache = (plan_hash, None)
                 return None
 
-            # 查找第一个未完成或进行中的步骤
-            for i, line in enumerate(plan_lines[steps_index + 1 :], start=0):
-                if "[ ]" in line or "[→]" in line:  # 未开始或进行中
-                    # 将当前步骤标记为进行中
-                    await self.available_tools.execute(
-                        name="planning",
-                        tool_input={
-                            "command": "mark_step",
-                            "plan_id": self.active_plan_id,
-                            "step_index": i,
-                            "step_status": "in_progress",
-                        },
-                    )
-                    return i  # 返回步骤索引
+            # 用预编译正则定位"Steps:"标题行
+            header = _STEPS_HEADER_RE.search(plan)
+            if header is None:  # 如果没有找到Steps行
+                self._step_index_cache = (plan_hash, None)
+                return None
 
-            return None  # 没有找到活动步骤
+            # 在标题行之后查找第一个未完成或进行中的步骤行，扫描由正则引擎在C层完成
+            match = _ACTIVE_STEP_RE.search(plan, header.end())
+            if match is None:
+                self._step_index_cache = (plan_hash, None)
+                return None  # 没有找到活动步骤
+
+            # 步骤索引 = 标题行末尾到匹配行起点之间的换行数 - 1
+            current_index = plan.count("\n", header.end(), match.start()) - 1
+
+            # 解析完成后仅发起一次planning工具调用，将当前步骤标记为进行中
+            async with self.planning_semaphore:  # 限制planning工具的在途调用数
+                await self.available_tools.execute(
+                    name="planning",
+                    tool_input={
+                        "command": "mark_step",
+                        "plan_id": self.active_plan_id,
+                        "step_index": current_index,
+                        "step_status": "in_progress",
+                    },
+                )
+            self._step_index_cache = (plan_hash, current_index)
+            return current_index  # 返回步骤索引
         except Exception as e:
             logger.warning(f"Error finding current step index: {e}")
             return None
@@ -288,7 +344,8 @@ class PlanningAgent(ToolCallAgent):
                 f"Analyze the request and create a plan with ID {self.active_plan_id}: {request}"
             )
         ]
-        self.memory.add_messages(messages)  # 将消息添加到内存
+        # 待提交的消息统一收集，流程结束后一次性写入内存
+        pending: List[Message] = list(messages)
 
         response = await self.llm.ask_tool(  # 调用LLM生成计划
             messages=messages,
@@ -299,33 +356,62 @@ class PlanningAgent(ToolCallAgent):
         assistant_msg = Message.from_tool_calls(  # 将LLM响应转换为消息
             content=response.content, tool_calls=response.tool_calls
         )
+        pending.append(assistant_msg)
 
-        self.memory.add_message(assistant_msg)  # 将消息添加到内存
+        # 将工具调用划分为planning调用与其他独立调用
+        planning_calls = [
+            tc for tc in response.tool_calls if tc.function.name == "planning"
+        ]
+        other_calls = [
+            tc for tc in response.tool_calls if tc.function.name != "planning"
+        ]
 
         plan_created = False
-        for tool_call in response.tool_calls:  # 处理工具调用
-            if tool_call.function.name == "planning":
-                result = await self.execute_tool(tool_call)  # 执行planning工具
-                logger.info(
-                    f"Executed tool {tool_call.function.name} with result: {result}"
-                )
-
-                # 将工具响应添加到内存
-                tool_msg = Message.tool_message(
+        if planning_calls:  # 没有planning调用时完全跳过执行
+            tool_call = planning_calls[0]
+            result = await self.execute_tool(tool_call)  # 执行planning工具
+            logger.info(
+                f"Executed tool {tool_call.function.name} with result: {result}"
+            )
+            pending.append(
+                Message.tool_message(
                     content=result,
                     tool_call_id=tool_call.id,
                     name=tool_call.function.name,
                 )
-                self.memory.add_message(tool_msg)
-                plan_created = True
-                break
+            )
+            plan_created = True
+
+            # 其余相互独立的工具调用以有界并发方式执行，避免串行等待
+            if other_calls:
+
+                async def _bounded_execute(tc: ToolCall) -> str:
+                    # 复用共享信号量限制在途调用数，防止压垮事件循环
+                    async with self.planning_semaphore:
+                        return await self.execute_tool(tc)
+
+                other_results = await asyncio.gather(
+                    *(_bounded_execute(tc) for tc in other_calls)
+                )
+                pending.extend(
+                    Message.tool_message(
+                        content=result,
+                        tool_call_id=tc.id,
+                        name=tc.function.name,
+                    )
+                    for tc, result in zip(other_calls, other_results)
+                )
 
         if not plan_created:  # 如果未创建计划
             logger.warning("No plan created from initial request")
-            tool_msg = Message.assistant_message(
-                "Error: Parameter `plan_id` is required for command: create"
+            pending.append(
+                Message.assistant_message(
+                    "Error: Parameter `plan_id` is required for command: create"
+                )
             )
-            self.memory.add_message(tool_msg)
+
+        # 全部消息一次性批量提交，摊薄逐条add_message的固定开销
+        self.memory.add_messages(pending)
 
 
 async def main():
@@ -336,6 +422,15 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
+    import sys
+
+    # 在非Windows平台上优先使用uvloop事件循环，降低代理循环中每次await的调度开销
+    if sys.platform != "win32":
+        try:
+            import uvloop
+
+            uvloop.install()
+        except ImportError:  # 未安装uvloop时回退到标准事件循环
+            pass
 
     asyncio.run(main())
@@ -26,12 +26,28 @@ class SWEAgent(ToolCallAgent):
     bash: Bash = Field(default_factory=Bash)  # Bash工具实例
     working_dir: str = "."  # 当前工作目录
 
+    # 工作目录缓存是否失效：首次运行或上一步执行过bash后需要重新获取
+    _working_dir_stale: bool = True
+
     async def think(self) -> bool:
         """处理当前状态并决定下一步操作"""
-        # 更新工作目录
-        self.working_dir = await self.bash.execute("pwd")
-        self.next_step_prompt = self.next_step_prompt.format(
-            current_dir=self.working_dir
-        )  # 格式化下一步提示模板
-
-        return await super().think()  # 调用父类的think方法
+        # 仅在缓存失效时才spawn子进程获取工作目录，避免每步都执行pwd
+        if self._working_dir_stale:
+            self.working_dir = await self.bash.execute("pwd")
+            self._working_dir_stale = False
+
+        # 基于不可变模板组装本次提示，避免对已格式化的结果重复format破坏提示内容
+        template = self.next_step_prompt
+        self.next_step_prompt = template.format(current_dir=self.working_dir)
+        try:
+            result = await super().think()  # 调用父类的think方法
+        finally:
+            self.next_step_prompt = template  # 恢复原始模板
+
+        # 本步若决定执行bash工具（可能切换目录），则下一步需重新获取工作目录
+        if self.tool_calls and any(
+            call.function.name == self.bash.name for call in self.tool_calls
+        ):
+            self._working_dir_stale = True
+
+        return result
@@ -1,7 +1,11 @@
 # 导入必要的模块
+import asyncio  # 异步IO，用于并发调度工具调用
+import hashlib  # 哈希计算，用于构造响应缓存键
+import io  # StringIO，用于流式结果的分块累积
 import json  # JSON处理
 
-from typing import Any, List, Literal, Optional, Union  # 类型注解
+from collections import OrderedDict  # 响应缓存的LRU淘汰
+from typing import Any, Dict, List, Literal, Optional, Union  # 类型注解
 
 from pydantic import Field  # 数据验证和设置管理
 
@@ -11,10 +15,48 @@ from app.logger import logger  # 日志记录器
 from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT  # 提示模板
 from app.schema import AgentState, Message, ToolCall, TOOL_CHOICE_TYPE, ToolChoice  # 数据模型
 from app.tool import CreateChatCompletion, Terminate, ToolCollection  # 工具集合
+from app.tool.base import BaseTool, ToolArgs  # 工具基类与参数的惰性解析包装
+
+# 实际解析由ToolArgs内部的orjson/json选择完成；此处只统一两种实现的
+# 解码错误类型，供execute_tool的except子句使用
+try:
+    import orjson
+
+    _JSON_DECODE_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError)
+except ImportError:
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError,)
 
 
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"  # 工具调用错误信息
 
+class _LazyJoin:
+    """惰性拼接的结果容器：到真正需要字符串时才执行一次join
+
+    act()的返回值在run()末尾汇总时才被格式化一次；提前拼接会为
+    大体量工具输出多付一次O(总长度)的字符串复制
+    """
+
+    __slots__ = ("parts", "sep")
+
+    def __init__(self, parts: List[str], sep: str = "\n\n"):
+        self.parts = parts  # 各工具调用的结果片段
+        self.sep = sep  # 拼接分隔符
+
+    def __str__(self) -> str:
+        return self.sep.join(self.parts)
+
+
+# tool_choice模式到think()处理器方法名的模块级分派表：
+# 模式在运行中不变，查表一次取代热路径上的多次枚举相等比较
+_THINK_HANDLER_NAMES = {
+    ToolChoice.NONE.value: "_think_none",
+    ToolChoice.REQUIRED.value: "_think_required",
+    ToolChoice.AUTO.value: "_think_auto",
+}
+
+# 响应缓存的条目上限，最久未命中的条目先被淘汰
+_RESPONSE_CACHE_SIZE = 32
+
 
 class ToolCallAgent(ReActAgent):
     """处理工具/函数调用的基础代理类，具有增强的抽象能力"""
@@ -35,22 +77,81 @@ class ToolCallAgent(ReActAgent):
 
     max_steps: int = 30  # 最大步骤数
     max_observe: Optional[Union[int, bool]] = None  # 最大观察长度
+    max_parallel_tools: int = Field(default=4, description="单步内并发执行工具调用的上限")  # 并发工具调用上限
+
+    # 限制在途工具调用数的共享信号量，首次使用时按max_parallel_tools惰性创建
+    _tool_semaphore: Optional[asyncio.Semaphore] = None
+    # 系统消息列表只构建一次并在各轮之间复用，保证请求前缀字节级一致
+    _cached_system_msgs: Optional[List[Message]] = None
+    # 工具参数列表与小写特殊工具名集合均为不可变配置的纯函数，惰性计算一次后复用
+    _tool_params_cache: Optional[List[dict]] = None
+    _special_tool_names_lower: Optional[frozenset] = None
+    # temperature为0时的响应缓存：键为(系统提示+工具schema)命名空间与完整会话内容的哈希，
+    # 以LRU方式限容
+    _response_cache: OrderedDict = OrderedDict()
+    _cache_namespace: Optional[str] = None
 
     async def think(self) -> bool:
         """处理当前状态并使用工具决定下一步操作"""
         if self.next_step_prompt:
             user_msg = Message.user_message(self.next_step_prompt)
-            self.messages += [user_msg]
-
-        # 获取带有工具选项的响应
-        response = await self.llm.ask_tool(
-            messages=self.messages,
-            system_msgs=[Message.system_message(self.system_prompt)]
-            if self.system_prompt
-            else None,
-            tools=self.available_tools.to_params(),
-            tool_choice=self.tool_choices,
-        )
+            # 直接追加到内存：避免`+= [msg]`产生的一次性列表分配，
+            # 也绕开messages属性setter的整体重建逻辑
+            self.memory.add_message(user_msg)
+
+        # 系统提示在各轮之间保持不变：复用同一Message实例并按工具名确定性排序，
+        # 使序列化后的请求前缀逐字节一致，从而命中服务端的自动提示前缀缓存；
+        # 任何易变内容（步骤计数、时间戳）都只出现在对话消息中，不污染该前缀
+        if self.system_prompt and self._cached_system_msgs is None:
+            self._cached_system_msgs = [Message.system_message(self.system_prompt)]
+
+        # 工具schema同样是每轮不变的纯配置，只在首轮遍历工具集合构建一次
+        if self._tool_params_cache is None:
+            self._tool_params_cache = sorted(
+                self.available_tools.to_params(),
+                key=lambda param: param["function"]["name"],
+            )
+
+        # 响应缓存：temperature为0时模型输出是确定性的，相同前缀下重复的
+        # 用户请求可直接复用上次的响应，省去一整次LLM网络往返；
+        # 非零temperature下输出不可复现，跳过缓存
+        cache_key = None
+        response = None
+        if self.llm.temperature == 0:
+            if self._cache_namespace is None:
+                self._cache_namespace = hashlib.sha256(
+                    (self.system_prompt or "").encode()
+                    + json.dumps(self._tool_params_cache, sort_keys=True).encode()
+                ).hexdigest()
+            # 键必须覆盖完整会话状态：think()每步都会追加相同的next_step_prompt
+            # 用户消息，只看最后一条用户消息会让第2步起的键与第1步相同，
+            # 首步响应被整轮重放；对全部消息内容取哈希后，只有对话历史
+            # 真正重复（同一请求重新提交）时才命中
+            history = json.dumps(
+                [msg.to_dict() for msg in self.messages],
+                sort_keys=True,
+                default=str,
+            )
+            cache_key = (
+                f"{self._cache_namespace}:"
+                f"{hashlib.sha256(history.encode()).hexdigest()}"
+            )
+            response = self._response_cache.get(cache_key)
+            if response is not None:
+                self._response_cache.move_to_end(cache_key)
+
+        if response is None:
+            # 获取带有工具选项的响应
+            response = await self.llm.ask_tool(
+                messages=self.messages,
+                system_msgs=self._cached_system_msgs,
+                tools=self._tool_params_cache,
+                tool_choice=self.tool_choices,
+            )
+            if cache_key is not None:
+                self._response_cache[cache_key] = response
+                if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)  # 淘汰最久未命中的条目
         self.tool_calls = response.tool_calls
 
         # 记录响应信息
@@ -64,35 +165,13 @@ class ToolCallAgent(ReActAgent):
             )
 
         try:
-            # 处理不同的工具选择模式
-            if self.tool_choices == ToolChoice.NONE:
-                if response.tool_calls:
-                    logger.warning(
-                        f"🤔 Hmm, {self.name} tried to use tools when they weren't available!"
-                    )
-                if response.content:
-                    self.memory.add_message(Message.assistant_message(response.content))
-                    return True
-                return False
-
-            # 创建并添加助手消息
-            assistant_msg = (
-                Message.from_tool_calls(
-                    content=response.content, tool_calls=self.tool_calls
-                )
-                if self.tool_calls
-                else Message.assistant_message(response.content)
-            )
-            self.memory.add_message(assistant_msg)
-
-            if self.tool_choices == ToolChoice.REQUIRED and not self.tool_calls:
-                return True  # 将在act()中处理
-
-            # 对于'auto'模式，如果没有命令但有内容，则继续处理内容
-            if self.tool_choices == ToolChoice.AUTO and not self.tool_calls:
-                return bool(response.content)
-
-            return bool(self.tool_calls)
+            # 模式只读取一次并经表分派到对应处理器，去掉逐分支的枚举相等比较；
+            # 按方法名取处理器，子类覆盖各处理器时仍能生效
+            mode = self.tool_choices
+            handler_name = _THINK_HANDLER_NAMES[
+                mode.value if isinstance(mode, ToolChoice) else mode
+            ]
+            return getattr(self, handler_name)(response)
         except Exception as e:
             logger.error(f"🚨 Oops! The {self.name}'s thinking process hit a snag: {e}")
             self.memory.add_message(
@@ -102,6 +181,40 @@ class ToolCallAgent(ReActAgent):
             )
             return False
 
+    def _record_assistant_message(self, response) -> None:
+        """将本轮LLM响应记录为助手消息（带或不带工具调用）"""
+        assistant_msg = (
+            Message.from_tool_calls(
+                content=response.content, tool_calls=self.tool_calls
+            )
+            if self.tool_calls
+            else Message.assistant_message(response.content)
+        )
+        self.memory.add_message(assistant_msg)
+
+    def _think_none(self, response) -> bool:
+        """tool_choice=NONE：忽略工具调用，仅在有文本内容时继续"""
+        if response.tool_calls:
+            logger.warning(
+                f"🤔 Hmm, {self.name} tried to use tools when they weren't available!"
+            )
+        if response.content:
+            self.memory.add_message(Message.assistant_message(response.content))
+            return True
+        return False
+
+    def _think_required(self, response) -> bool:
+        """tool_choice=REQUIRED：始终继续，缺失工具调用的情况在act()中处理"""
+        self._record_assistant_message(response)
+        return True
+
+    def _think_auto(self, response) -> bool:
+        """tool_choice=AUTO：有工具调用则执行，否则有内容时继续处理内容"""
+        self._record_assistant_message(response)
+        if not self.tool_calls:
+            return bool(response.content)
+        return True
+
     async def act(self) -> str:
         """执行工具调用并处理其结果"""
         if not self.tool_calls:
@@ -111,9 +224,19 @@ class ToolCallAgent(ReActAgent):
             # 如果没有工具调用，返回最后一条消息的内容
             return self.messages[-1].content or "No content or commands to execute"
 
+        # 并发执行全部工具调用：相互独立的IO型工具不再串行等待，
+        # 总耗时约等于最慢的一个调用而非各调用之和
+        raw_results = await asyncio.gather(
+            *(self._bounded_execute_tool(command) for command in self.tool_calls),
+            return_exceptions=True,
+        )
+
+        # 第二遍快速同步处理：按原始顺序截断、记录日志并写入内存，
+        # 保证tool_call_id的顺序与助手消息一致
         results = []
-        for command in self.tool_calls:
-            result = await self.execute_tool(command)
+        for command, result in zip(self.tool_calls, raw_results):
+            if isinstance(result, BaseException):
+                result = f"Error: ⚠️ Tool '{command.function.name}' encountered a problem: {str(result)}"
 
             if self.max_observe:
                 result = result[: self.max_observe]
@@ -129,7 +252,16 @@ class ToolCallAgent(ReActAgent):
             self.memory.add_message(tool_msg)
             results.append(result)
 
-        return "\n\n".join(results)
+        # 返回惰性拼接对象：各调用方（run()的汇总f-string、日志）按需str()一次，
+        # 省去此处无人立即消费的整体拼接
+        return _LazyJoin(results)
+
+    async def _bounded_execute_tool(self, command: ToolCall) -> str:
+        """在共享信号量约束下执行单个工具调用，限制并发数以遵守外部速率限制"""
+        if self._tool_semaphore is None:
+            self._tool_semaphore = asyncio.Semaphore(self.max_parallel_tools)
+        async with self._tool_semaphore:
+            return await self.execute_tool(command)
 
     async def execute_tool(self, command: ToolCall) -> str:
         """执行单个工具调用，具有健壮的错误处理"""
@@ -141,12 +273,23 @@ class ToolCallAgent(ReActAgent):
             return f"Error: Unknown tool '{name}'"
 
         try:
-            # 解析参数
-            args = json.loads(command.function.arguments or "{}")
+            # 参数以惰性包装传递：原始JSON文本原样携带，解析推迟到工具真正分发时
+            args = ToolArgs(command.function.arguments)
 
             # 执行工具
             logger.info(f"🔧 Activating tool: '{name}'...")
-            result = await self.available_tools.execute(name=name, tool_input=args)
+            tool = self.available_tools.get_tool(name)
+            if self.max_observe and type(tool).execute_stream is not BaseTool.execute_stream:
+                # 流式快路径：覆盖了execute_stream的工具按块产出结果，
+                # 累积达到观察上限即提前终止，完整的大体量输出不再被物化
+                buf = io.StringIO()
+                async for chunk in tool.execute_stream(**args.parsed):
+                    buf.write(chunk)
+                    if buf.tell() >= self.max_observe:
+                        break
+                result = buf.getvalue()
+            else:
+                result = await self.available_tools.execute(name=name, tool_input=args)
 
             # 格式化结果以便显示
             observation = (
@@ -159,7 +302,7 @@ class ToolCallAgent(ReActAgent):
             await self._handle_special_tool(name=name, result=result)
 
             return observation
-        except json.JSONDecodeError:
+        except _JSON_DECODE_ERRORS:
             error_msg = f"Error parsing arguments for {name}: Invalid JSON format"
             logger.error(
                 f"📝 Oops! The arguments for '{name}' don't make sense - invalid JSON, arguments:{command.function.arguments}"
@@ -172,10 +315,25 @@ class ToolCallAgent(ReActAgent):
 
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         """处理特殊工具执行和状态变更"""
-        if not self._is_special_tool(name):
+        cls = type(self)
+        # 子类未覆盖_is_special_tool时内联为集合查找，省去每个工具结果上的
+        # 一次方法调用帧；覆盖了则仍走子类实现以保持扩展契约
+        if cls._is_special_tool is ToolCallAgent._is_special_tool:
+            if self._special_tool_names_lower is None:
+                self._special_tool_names_lower = frozenset(
+                    n.lower() for n in self.special_tool_names
+                )
+            if name.lower() not in self._special_tool_names_lower:
+                return
+        elif not self._is_special_tool(name):
             return
 
-        if self._should_finish_execution(name=name, result=result, **kwargs):
+        # 默认的_should_finish_execution恒为True：未被子类覆盖时直接短路，
+        # 连这次调用也省掉
+        if (
+            cls._should_finish_execution is ToolCallAgent._should_finish_execution
+            or self._should_finish_execution(name=name, result=result, **kwargs)
+        ):
             # 将代理状态设置为完成
             logger.info(f"🏁 Special tool '{name}' has completed the task!")
             self.state = AgentState.FINISHED
@@ -187,4 +345,9 @@ class ToolCallAgent(ReActAgent):
 
     def _is_special_tool(self, name: str) -> bool:
         """检查工具名称是否在特殊工具列表中"""
-        return name.lower() in [n.lower() for n in self.special_tool_names]
+        # 小写集合只构建一次，之后每次调用都是O(1)的集合查找
+        if self._special_tool_names_lower is None:
+            self._special_tool_names_lower = frozenset(
+                n.lower() for n in self.special_tool_names
+            )
+        return name.lower() in self._special_tool_names_lower
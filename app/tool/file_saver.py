@@ -1,8 +1,21 @@
+import asyncio  # 异步IO，用于把目录创建下放到工作线程
+import concurrent.futures  # 文件IO专用线程池
 import os  # 导入操作系统接口模块，用于路径操作
+from functools import partial  # 预绑定makedirs参数供执行器调用
 import aiofiles  # 异步文件操作库，用于非阻塞文件写入
 
 from app.tool.base import BaseTool  # 导入工具基类
 
+_CHUNK_SIZE = 1 << 20  # 大文件按1MiB分块写入，块间让出事件循环
+_SMALL_WRITE_LIMIT = 1 << 16  # 64KiB以内的负载保持单次写入快路径
+
+# 文件IO专用线程池：不与默认执行器上的DNS解析、搜索等阻塞任务
+# 抢工作线程，繁忙时文件写入不被无关操作排队阻塞
+_FILE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=min(8, (os.cpu_count() or 2) * 2), thread_name_prefix="file_saver"
+)
+
+
 class FileSaver(BaseTool):
     name: str = "file_saver"  # 工具名称标识符
     description: str = """Save content to a local file at a specified path.
@@ -36,14 +49,28 @@ The tool accepts content and a file path, and saves the content to that location
     ) -> str:
         """执行文件保存的核心方法"""
         try:
-            # 确保目标目录存在（自动创建缺失目录）
+            # 确保目标目录存在：exist_ok合并“检查+创建”为单次调用（也消除TOCTOU窗口），
+            # 并放入文件专用线程池执行，深路径的逐级stat不阻塞事件循环
             directory = os.path.dirname(file_path)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory)  # 递归创建父目录
+            if directory:
+                await asyncio.get_running_loop().run_in_executor(
+                    _FILE_EXECUTOR, partial(os.makedirs, directory, exist_ok=True)
+                )
+
+            # 只编码一次，之后以二进制模式写入，避免文本层的重复编码
+            data = content.encode("utf-8")
 
-            # 异步写入文件内容
-            async with aiofiles.open(file_path, mode, encoding="utf-8") as file:
-                await file.write(content)  # 写入内容到文件
+            # 异步写入文件内容（open/write/close都走专用线程池）
+            async with aiofiles.open(
+                file_path, mode + "b", executor=_FILE_EXECUTOR
+            ) as file:
+                if len(data) < _SMALL_WRITE_LIMIT:
+                    await file.write(data)  # 小负载单次写完
+                else:
+                    # 大负载分块写：memoryview切片零拷贝，每块之间其他协程可继续推进
+                    view = memoryview(data)
+                    for offset in range(0, len(data), _CHUNK_SIZE):
+                        await file.write(view[offset : offset + _CHUNK_SIZE])
 
             return f"Content successfully saved to {file_path}"  # 成功提示
         except Exception as e:
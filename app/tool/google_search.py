@@ -1,9 +1,20 @@
 import asyncio  # 导入异步IO库，用于异步执行搜索操作
+import concurrent.futures  # 线程池执行器，用于承载阻塞式搜索调用
+import itertools  # islice提前截断搜索结果生成器
 from typing import List  # 导入类型提示中的列表类型
 
 from googlesearch import search  # 导入Google搜索API的搜索函数
 from app.tool.base import BaseTool  # 导入工具基类
 
+# 搜索专用线程池：不与默认执行器上的其他阻塞任务抢工作线程，
+# 线程常驻复用，省去默认执行器冷启动的线程创建
+_SEARCH_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="gsearch"
+)
+# 同时外呼的查询数上限，降低触发Google限流的概率
+_SEARCH_SEMAPHORE = asyncio.Semaphore(4)
+
+
 class GoogleSearch(BaseTool):
     name: str = "google_search"  # 工具名称标识符
     description: str = """Perform a Google search and return a list of relevant links.
@@ -31,10 +42,17 @@ The tool returns a list of URLs that match the search query.
         self, query: str, num_results: int = 10
     ) -> List[str]:
         """执行搜索的核心异步方法"""
-        # 在线程池中运行以避免阻塞事件循环
+        # 在专用线程池中运行以避免阻塞事件循环，并以信号量约束在途查询数；
+        # islice在第num_results个结果处截断生成器，后续页面的抓取与
+        # HTML解析根本不会发生（小结果数查询因此成比例省掉解析量）
         loop = asyncio.get_event_loop()  # 获取当前事件循环
-        links = await loop.run_in_executor(  # 异步执行搜索操作
-            None,
-            lambda: list(search(query, num_results=num_results)),  # 调用search函数并转换为列表
-        )
+        async with _SEARCH_SEMAPHORE:
+            links = await loop.run_in_executor(  # 异步执行搜索操作
+                _SEARCH_EXECUTOR,
+                lambda: list(
+                    itertools.islice(
+                        search(query, num_results=num_results), num_results
+                    )
+                ),
+            )
         return links  # 返回搜索结果链接列表
@@ -1,9 +1,33 @@
 # tool/planning.py
+from collections import Counter
 from typing import Dict, List, Literal, Optional
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
 
+# 全部合法的步骤状态，也是status_counts字典的固定键集
+_STEP_STATUSES = ("not_started", "in_progress", "completed", "blocked")
+
+# 状态到显示符号的映射，模块级常量免去每次格式化重建字典
+_STATUS_SYM = {
+    "not_started": "□",
+    "in_progress": "▶",
+    "completed": "✓",
+    "blocked": "‼",
+}
+
+# 指令到(处理方法名, 参数名序列)的分发表：O(1)哈希查找取代
+# 最长7次字符串比较的if/elif阶梯
+_COMMAND_DISPATCH = {
+    "create": ("_create_plan", ("plan_id", "title", "steps")),
+    "update": ("_update_plan", ("plan_id", "title", "steps")),
+    "list": ("_list_plans", ()),
+    "get": ("_get_plan", ("plan_id",)),
+    "set_active": ("_set_active_plan", ("plan_id",)),
+    "mark_step": ("_mark_step", ("plan_id", "step_index", "step_status", "step_notes")),
+    "delete": ("_delete_plan", ("plan_id",)),
+}
+
 _PLANNING_TOOL_DESCRIPTION = """
 A planning tool that allows the agent to create and manage plans for solving complex tasks.
 The tool provides functionality for creating plans, updating plan steps, and tracking progress.
@@ -74,22 +98,19 @@ class PlanningTool(BaseTool):
         **kwargs,
     ):
         """执行具体操作的分发方法"""
-        if command == "create":  # 创建新计划
-            return self._create_plan(plan_id, title, steps)
-        elif command == "update":  # 更新现有计划
-            return self._update_plan(plan_id, title, steps)
-        elif command == "list":  # 列出所有计划
-            return self._list_plans()
-        elif command == "get":  # 获取指定计划详情
-            return self._get_plan(plan_id)
-        elif command == "set_active":  # 设置当前激活计划
-            return self._set_active_plan(plan_id)
-        elif command == "mark_step":  # 标记步骤状态
-            return self._mark_step(plan_id, step_index, step_status, step_notes)
-        elif command == "delete":  # 删除计划
-            return self._delete_plan(plan_id)
-        else:  # 无效指令处理
+        entry = _COMMAND_DISPATCH.get(command)
+        if entry is None:  # 无效指令处理
             raise ToolError(f"不支持的指令：{command}")
+        method_name, arg_names = entry
+        params = {
+            "plan_id": plan_id,
+            "title": title,
+            "steps": steps,
+            "step_index": step_index,
+            "step_status": step_status,
+            "step_notes": step_notes,
+        }
+        return getattr(self, method_name)(*(params[name] for name in arg_names))
 
     def _create_plan(  # 创建新计划的私有方法
         self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
@@ -103,13 +124,18 @@ class PlanningTool(BaseTool):
             raise ToolError("必须提供计划标题")
         if not steps or not isinstance(steps, list) or not all(isinstance(s, str) for s in steps):
             raise ToolError("步骤必须为非空字符串列表")
-        # 初始化步骤状态和备注
+        # 初始化步骤状态和备注；status_counts随状态变更增量维护，
+        # 格式化时无需再对状态列表做多趟count扫描
         plan = {
             "plan_id": plan_id,
             "title": title,
             "steps": steps,
             "step_statuses": ["not_started"] * len(steps),
             "step_notes": [""] * len(steps),
+            "status_counts": {
+                "not_started": len(steps), "in_progress": 0,
+                "completed": 0, "blocked": 0,
+            },
         }
         self.plans[plan_id] = plan  # 存储新计划
         self._current_plan_id = plan_id  # 设置为当前激活计划
@@ -130,32 +156,40 @@ class PlanningTool(BaseTool):
             if not isinstance(steps, list) or not all(isinstance(s, str) for s in steps):
                 raise ToolError("步骤必须为字符串列表")
             old_steps = plan["steps"]
-            old_statuses = plan["step_statuses"]
-            old_notes = plan["step_notes"]
-            new_statuses = []
-            new_notes = []
-            for i, step in enumerate(steps):
-                if i < len(old_steps) and step == old_steps[i]:
-                    new_statuses.append(old_statuses[i])
-                    new_notes.append(old_notes[i])
-                else:
-                    new_statuses.append("not_started")
-                    new_notes.append("")
-            plan["steps"] = steps
-            plan["step_statuses"] = new_statuses
-            plan["step_notes"] = new_notes
+            if steps == old_steps:
+                pass  # 步骤原样传回（如只改标题），状态/备注/计数全部保持
+            else:
+                old_statuses = plan["step_statuses"]
+                old_notes = plan["step_notes"]
+                new_statuses = []
+                new_notes = []
+                old_len = len(old_steps)  # 循环外取一次长度
+                for i, step in enumerate(steps):
+                    if i < old_len and step == old_steps[i]:
+                        new_statuses.append(old_statuses[i])
+                        new_notes.append(old_notes[i])
+                    else:
+                        new_statuses.append("not_started")
+                        new_notes.append("")
+                plan["steps"] = steps
+                plan["step_statuses"] = new_statuses
+                plan["step_notes"] = new_notes
+                # 状态列表整体重建，计数也一次性重建
+                counts = Counter(new_statuses)
+                plan["status_counts"] = {s: counts[s] for s in _STEP_STATUSES}
         return ToolResult(output=f"计划更新成功：{plan_id}\n\n{self._format_plan(plan)}")
 
     def _list_plans(self) -> ToolResult:  # 列出所有计划
         """获取所有计划的概要信息"""
         if not self.plans:  # 空处理
             return ToolResult(output="暂无任何计划，请使用create指令创建")
-        output = "可用计划列表：\n"
-        for pid, p in self.plans.items():
-            current = " (当前)" if pid == self._current_plan_id else ""
-            completed = sum(1 for s in p["step_statuses"] if s == "completed")
-            output += f"• {pid}{current}: {p['title']} - {completed}/{len(p['steps'])}步骤完成\n"
-        return ToolResult(output=output)
+        # 与_format_plan同理：收集行后一次join，替代逐行+=的平方级拼接
+        lines = ["可用计划列表："] + [
+            f"• {pid}{' (当前)' if pid == self._current_plan_id else ''}: "
+            f"{p['title']} - {p['status_counts']['completed']}/{len(p['steps'])}步骤完成"
+            for pid, p in self.plans.items()
+        ]
+        return ToolResult(output="\n".join(lines) + "\n")
 
     def _get_plan(self, plan_id: Optional[str]) -> ToolResult:  # 获取计划详情
         """获取指定计划的详细信息"""
@@ -193,9 +227,13 @@ class PlanningTool(BaseTool):
         plan = self.plans[plan_id]
         if step_index < 0 or step_index >= len(plan["steps"]):
             raise ToolError(f"步骤索引{step_index}超出范围")
-        if step_status and step_status not in ["not_started", "in_progress", "completed", "blocked"]:
+        if step_status and step_status not in _STEP_STATUSES:
             raise ToolError("无效的状态值")
         if step_status:
+            # 增量维护计数：旧状态桶减一，新状态桶加一
+            counts = plan["status_counts"]
+            counts[plan["step_statuses"][step_index]] -= 1
+            counts[step_status] += 1
             plan["step_statuses"][step_index] = step_status
         if step_notes:
             plan["step_notes"][step_index] = step_notes
@@ -213,22 +251,32 @@ class PlanningTool(BaseTool):
         return ToolResult(output=f"已删除计划：{plan_id}")
 
     def _format_plan(self, plan: Dict) -> str:  # 格式化输出计划信息
-        """将计划数据格式化为可读字符串"""
-        output = f"计划：{plan['title']} (ID：{plan['plan_id']})\n"
-        output += "=" * len(output) + "\n\n"
+        """将计划数据格式化为可读字符串
+
+        片段收集进列表、末尾一次join：逐行+=每次都复制整个累积串，
+        总开销随字符数平方增长，长计划下差距显著
+        """
+        title_line = f"计划：{plan['title']} (ID：{plan['plan_id']})"
         total = len(plan["steps"])
-        completed = sum(s == "completed" for s in plan["step_statuses"])
-        output += f"进度：{completed}/{total} ({(completed/total*100):.1f}%)\n"
-        output += f"状态：完成{completed}个，进行中{plan['step_statuses'].count('in_progress')}个，阻塞{plan['step_statuses'].count('blocked')}个，未开始{plan['step_statuses'].count('not_started')}个\n\n"
-        output += "步骤详情：\n"
+        counts = plan["status_counts"]  # 增量维护的计数，免去对状态列表的5趟扫描
+        completed = counts["completed"]
+        # 进度百分比走整数路径：千分值+半偶舍入，避开浮点除法与float.__format__
+        pct = 0
+        if total:
+            pct, rem = divmod(completed * 1000, total)
+            if 2 * rem > total or (2 * rem == total and pct % 2 == 1):
+                pct += 1
+        parts = [
+            title_line,
+            "=" * (len(title_line) + 1),
+            "",
+            f"进度：{completed}/{total} ({pct//10}.{pct%10}%)",
+            f"状态：完成{completed}个，进行中{counts['in_progress']}个，阻塞{counts['blocked']}个，未开始{counts['not_started']}个",
+            "",
+            "步骤详情：",
+        ]
         for i, (step, status, note) in enumerate(zip(plan["steps"], plan["step_statuses"], plan["step_notes"])):
-            status_sym = {
-                "not_started": "□",
-                "in_progress": "▶",
-                "completed": "✓",
-                "blocked": "‼"
-            }.get(status, "□")
-            output += f"{i}. {status_sym} {step}\n"
+            parts.append(f"{i}. {_STATUS_SYM.get(status, '□')} {step}")
             if note:
-                output += f"   备注：{note}\n"
-        return output
+                parts.append(f"   备注：{note}")
+        return "\n".join(parts) + "\n"
@@ -1,11 +1,40 @@
-import threading
-from typing import Dict
+import asyncio
+import builtins
+import concurrent.futures
+import multiprocessing
+import sys
+from io import StringIO
+from typing import Any, Dict, Optional
 
 from app.tool.base import BaseTool
 
+# 内建命名空间在模块导入时快照一份：执行时零复制，同时隔离真正的
+# builtins模块字典——工作进程常驻，用户代码改写__builtins__不能
+# 毒化解释器自身的内建映射
+_SAFE_BUILTINS = dict(vars(builtins))
+
+def _exec_snippet(code: str) -> Dict:
+    """在工作进程内执行代码片段并捕获print输出
+
+    运行于fork出的常驻工作进程：解释器与已加载模块随fork继承，
+    每次调用免去约30-50ms的python冷启动
+    """
+    output_buffer = StringIO()
+    old_stdout = sys.stdout
+    sys.stdout = output_buffer  # 重定向标准输出（只影响工作进程自身）
+    try:
+        # 外层字典仍每次新建，片段之间不共享全局变量
+        safe_globals = {"__builtins__": _SAFE_BUILTINS}
+        exec(code, safe_globals, {})  # 执行用户提供的代码
+        return {"observation": output_buffer.getvalue()}  # 返回执行输出
+    except Exception as e:  # 捕获异常
+        return {"observation": str(e), "success": False}  # 记录错误信息
+    finally:
+        sys.stdout = old_stdout  # 恢复标准输出
+
 class PythonExecute(BaseTool):
     """用于执行Python代码的工具类，支持超时控制和安全限制"""
-    
+
     name: str = "python_execute"  # 工具名称标识符
     description: str = "执行Python代码字符串。注意：仅能查看print输出，函数返回值不会被捕获，请使用print语句查看结果"  # 工具功能描述
     parameters: dict = {  # 参数定义结构
@@ -19,42 +48,45 @@ class PythonExecute(BaseTool):
         "required": ["code"],  # 必填参数列表
     }
 
+    # 预热的fork工作进程池，首次执行时惰性创建
+    _pool: Optional[Any] = None
+
+    def _ensure_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """惰性创建（或在超时清理后重建）工作进程池"""
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=2, mp_context=multiprocessing.get_context("fork")
+            )
+        return self._pool
+
+    def _kill_pool(self):
+        """杀掉全部工作进程并丢弃池：超时后唯一可靠的回收手段"""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # Executor没有公开的强制终止接口，直接终结其工作进程
+        for proc in list(pool._processes.values()):
+            proc.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
     async def execute(  # 工具执行方法
         self,
         code: str,  # 要执行的Python代码
         timeout: int = 5,  # 执行超时时间（秒）
     ) -> Dict:  # 返回执行结果字典
-        """执行Python代码并处理超时与异常"""
-        result = {"observation": ""}  # 初始化结果字典
-
-        def run_code():  # 子线程执行函数
-            try:
-                safe_globals = {"__builtins__": dict(__builtins__)}  # 创建安全的全局变量环境
-                
-                import sys
-                from io import StringIO
-                
-                output_buffer = StringIO()  # 捕获输出的缓冲区
-                sys.stdout = output_buffer  # 重定向标准输出
-                
-                exec(code, safe_globals, {})  # 执行用户提供的代码
-                
-                sys.stdout = sys.__stdout__  # 恢复标准输出
-                
-                result["observation"] = output_buffer.getvalue()  # 保存执行输出
-                
-            except Exception as e:  # 捕获异常
-                result["observation"] = str(e)  # 记录错误信息
-                result["success"] = False  # 标记执行失败
-
-        thread = threading.Thread(target=run_code)  # 创建执行线程
-        thread.start()  # 启动线程
-        thread.join(timeout)  # 等待线程完成或超时
-        
-        if thread.is_alive():  # 检查是否超时
-            return {  # 返回超时信息
+        """在预热的工作进程中执行Python代码并处理超时与异常
+
+        短代码片段的耗时由进程冷启动主导；常驻工作进程把分发开销
+        降到毫秒级，超时则杀掉工作进程重建池，用户代码被真正中止
+        """
+        future = self._ensure_pool().submit(_exec_snippet, code)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=timeout
+            )
+        except asyncio.TimeoutError:  # 超时处理：工作进程可能还在跑，强制回收
+            self._kill_pool()
+            return {
                 "observation": f"执行超时（超过{timeout}秒）",
                 "success": False,
             }
-        
-        return result  # 返回执行结果
@@ -12,6 +12,27 @@ def maybe_truncate(content: str, truncate_after: int | None = MAX_RESPONSE_LEN)
     else:
         return content[:truncate_after] + TRUNCATED_MESSAGE
 
+def _truncate_decode(data: bytes, truncate_after: int | None) -> str:
+    """先在字节层截断再解码：超长输出只解码前truncate_after字节，
+    不再先整体decode出一份完整字符串后丢弃大半"""
+    if not truncate_after or len(data) <= truncate_after:
+        return data.decode(errors="replace")
+    # replace兜住截断点恰好落在多字节序列中间的情况
+    return data[:truncate_after].decode(errors="replace") + TRUNCATED_MESSAGE
+
+async def _read_capped(stream: asyncio.StreamReader, cap: int | None) -> bytes:
+    """分块读取流直到关闭，超过上限后继续排空但不再积累
+
+    子进程打印多少都照常消费（不排空会把管道写满堵死子进程），
+    内存峰值却与输出总量解耦，封顶在cap+一个块的大小"""
+    buf = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return bytes(buf)
+        if cap is None or len(buf) <= cap:
+            buf += chunk  # 略超cap即停止积累，截齐交给_truncate_decode
+
 async def run(
     cmd: str,  # 要执行的shell命令
     timeout: float | None = 120.0,  # 命令超时时间（秒），默认120秒
@@ -25,14 +46,20 @@ async def run(
     )
     
     try:
+        # 两个带上限的读取任务并发排空stdout/stderr，替代communicate()
+        # 的全量缓冲——超长输出（构建日志等）不再整份驻留内存
         stdout, stderr = await asyncio.wait_for(
-            process.communicate(),  # 等待命令执行完成
+            asyncio.gather(
+                _read_capped(process.stdout, truncate_after),
+                _read_capped(process.stderr, truncate_after),
+            ),
             timeout=timeout  # 应用超时限制
         )
+        await process.wait()  # 流已关闭，回收子进程
         return (
             process.returncode or 0,  # 返回退出码（失败时默认0）
-            maybe_truncate(stdout.decode(), truncate_after),  # 处理标准输出
-            maybe_truncate(stderr.decode(), truncate_after)  # 处理标准错误
+            _truncate_decode(stdout, truncate_after),  # 处理标准输出
+            _truncate_decode(stderr, truncate_after)  # 处理标准错误
         )
     except asyncio.TimeoutError as exc:  # 超时处理
         try:
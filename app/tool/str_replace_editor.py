@@ -1,16 +1,20 @@
 """字符串替换编辑工具模块，支持文件查看、创建、替换、插入和撤销操作"""
 
-from collections import defaultdict
+import os
+import stat
+from collections import OrderedDict, defaultdict, deque
+from itertools import islice
 from pathlib import Path
 from typing import Literal, get_args
 
 from app.exceptions import ToolError
 from app.tool import BaseTool
 from app.tool.base import CLIResult, ToolResult
-from app.tool.run import run
 
 Command = Literal["view", "create", "str_replace", "insert", "undo_edit"]
 SNIPPET_LINES: int = 4  # 编辑时显示的上下文行数
+READ_CACHE_SIZE: int = 16  # 文件读取缓存的条目上限
+FILE_HISTORY_LIMIT: int = 8  # 每个文件保留的可撤销快照数上限
 MAX_RESPONSE_LEN: int = 16000  # 最大响应长度限制
 TRUNCATED_MESSAGE: str = "<response clipped><NOTE>为节省上下文空间，仅显示部分内容。如需完整内容，请使用`grep -n`搜索文件后重新查询。</NOTE>"
 
@@ -32,6 +36,11 @@ def maybe_truncate(content: str, truncate_after: int | None = MAX_RESPONSE_LEN)
         return content
     return content[:truncate_after] + TRUNCATED_MESSAGE
 
+def _expand_tabs(text: str) -> str:
+    """无制表符时原样返回：一次C层字符扫描换掉整份字符串的复制，
+    代码文件绝大多数不含\\t，expandtabs几乎总在做无用功"""
+    return text.expandtabs() if "\t" in text else text
+
 class StrReplaceEditor(BaseTool):
     """文件编辑工具类，支持查看、创建、替换、插入和撤销操作"""
     
@@ -74,7 +83,11 @@ class StrReplaceEditor(BaseTool):
         "required": ["command", "path"],  # 必填参数列表
     }
 
-    _file_history: dict = defaultdict(list)  # 文件编辑历史记录
+    # 文件编辑历史记录：maxlen自动淘汰最旧快照，长会话下内存保持O(1)
+    # 而非随编辑次数无限增长
+    _file_history: dict = defaultdict(lambda: deque(maxlen=FILE_HISTORY_LIMIT))
+    # 读取缓存：键为(路径, mtime_ns, 大小)，文件未变更时免去重复IO与解码
+    _read_cache: OrderedDict = OrderedDict()
 
     async def execute(  # 工具执行入口方法
         self,
@@ -115,14 +128,20 @@ class StrReplaceEditor(BaseTool):
 
     def validate_path(self, command: str, path: Path):
         """验证路径与指令的兼容性"""
-        if not path.is_absolute():  # 绝对路径检查
+        if not os.path.isabs(str(path)):  # 绝对路径检查：纯字符串判断，无系统调用
             suggested_path = Path("") / path
             raise ToolError(f"路径应为绝对路径，是否指：{suggested_path}?")
-        if not path.exists() and command != "create":  # 文件存在性检查
+        # 单次stat同时得到存在性与目录标志；原先exists/is_dir各stat一趟
+        try:
+            is_dir = stat.S_ISDIR(os.stat(path).st_mode)
+            exists = True
+        except (FileNotFoundError, NotADirectoryError):
+            exists = is_dir = False
+        if not exists and command != "create":  # 文件存在性检查
             raise ToolError(f"路径不存在：{path}")
-        if path.exists() and command == "create":  # 创建冲突检查
+        if exists and command == "create":  # 创建冲突检查
             raise ToolError(f"文件已存在：{path}")
-        if path.is_dir() and command != "view":  # 目录操作限制
+        if is_dir and command != "view":  # 目录操作限制
             raise ToolError(f"目录仅支持`view`指令：{path}")
 
     async def view(self, path: Path, view_range: list[int] | None = None) -> CLIResult:
@@ -130,58 +149,145 @@ class StrReplaceEditor(BaseTool):
         if path.is_dir():  # 目录查看
             if view_range:
                 raise ToolError("目录查看不支持`view_range`参数")
-            _, stdout, stderr = await run(f"find {path} -maxdepth 2 -not -path '*/\.*'")
-            return CLIResult(output=stdout, error=stderr)
+            # 进程内scandir替代fork出sh+find：省去两次fork/exec与管道往返
+            return CLIResult(output=self._list_dir(path))
         else:  # 文件查看
-            content = self.read_file(path)
             if view_range:  # 处理行号范围参数
                 if len(view_range) != 2 or not all(isinstance(i, int) for i in view_range):
                     raise ToolError("`view_range`应为两个整数的列表")
-                lines = content.split("\n")
                 start, end = view_range
-                if start < 1 or start > len(lines):
-                    raise ToolError(f"起始行号{start}超出范围[1-{len(lines)}]")
-                if end != -1 and (end < start or end > len(lines)):
-                    raise ToolError(f"结束行号{end}超出范围[start-{len(lines)}]")
-                content = "\n".join(lines[start-1:end] if end != -1 else lines[start-1:])
+                # 快路径：流式只读区间内的行，IO与内存为O(区间)而非O(文件)；
+                # 区间明显非法或触及文件末尾时返回None，退回整读做精确校验
+                content = None
+                if start >= 1 and (end == -1 or end >= start):
+                    content = self._read_range(path, start, end)
+                if content is None:  # 慢路径：整读，错误信息与边界语义保持原样
+                    lines = self.read_file(path).split("\n")
+                    if start < 1 or start > len(lines):
+                        raise ToolError(f"起始行号{start}超出范围[1-{len(lines)}]")
+                    if end != -1 and (end < start or end > len(lines)):
+                        raise ToolError(f"结束行号{end}超出范围[start-{len(lines)}]")
+                    content = "\n".join(lines[start-1:end] if end != -1 else lines[start-1:])
+            else:
+                content = self.read_file(path)
             return CLIResult(output=self._make_output(content, str(path), start_line=view_range[0] if view_range else 1))
 
+    def _list_dir(self, path: Path) -> str:
+        """进程内列出目录2层深度的非隐藏条目，语义对齐原先的find命令"""
+        lines = [str(path)]
+        try:
+            with os.scandir(path) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    if entry.name.startswith("."):
+                        continue  # 跳过隐藏文件/目录
+                    lines.append(entry.path)
+                    if entry.is_dir(follow_symlinks=False):
+                        try:
+                            with os.scandir(entry.path) as sub:
+                                lines.extend(
+                                    child.path
+                                    for child in sorted(sub, key=lambda e: e.name)
+                                    if not child.name.startswith(".")
+                                )
+                        except PermissionError:
+                            pass  # 无权限的子目录跳过，与find打印错误后继续一致
+        except Exception as e:
+            raise ToolError(f"读取目录失败：{path}，错误：{str(e)}")
+        return "\n".join(lines) + "\n"
+
+    def _read_range(self, path: Path, start: int, end: int) -> str | None:
+        """按行号范围流式读取文件，只消费[start, end]区间内的行
+
+        区间不完全落在文件内时返回None，由调用方退回整读路径
+        """
+        try:
+            with path.open("r") as f:
+                lines = list(islice(f, start - 1, None if end == -1 else end))
+        except Exception as e:
+            raise ToolError(f"读取文件失败：{path}，错误：{str(e)}")
+        if not lines:
+            return None  # 起始行越界（或空文件），交由慢路径给出准确报错
+        if end != -1:
+            if len(lines) < end - start + 1:
+                return None  # 结束行越界，同样退回慢路径
+            content = "".join(lines)
+            # 对齐原先split/join切片的结果：界内区间不带结尾换行
+            return content[:-1] if content.endswith("\n") else content
+        return "".join(lines)  # 读到末尾时与原切片一样保留文件本身的结尾形态
+
     def str_replace(self, path: Path, old_str: str, new_str: str | None) -> CLIResult:
         """实现字符串精确替换功能"""
-        current_content = self.read_file(path).expandtabs()
-        old_str_expanded = old_str.expandtabs()
-        new_str_expanded = new_str.expandtabs() if new_str else ""
+        current_content = _expand_tabs(self.read_file(path))
+        old_str_expanded = _expand_tabs(old_str)
+        new_str_expanded = _expand_tabs(new_str) if new_str else ""
         
-        # 确保旧字符串唯一匹配
-        occurrences = current_content.count(old_str_expanded)
-        if occurrences == 0:
+        # 确保旧字符串唯一匹配：find定位首个匹配，从其末尾再find一次验证唯一性，
+        # 全文扫描从count/replace/split的4趟降到2趟；逐行定位只在报错路径才做
+        idx = current_content.find(old_str_expanded)
+        if idx == -1:
             raise ToolError(f"未找到匹配内容：{old_str}")
-        if occurrences > 1:
+        if current_content.find(old_str_expanded, idx + len(old_str_expanded)) != -1:
             lines = [i+1 for i, line in enumerate(current_content.split("\n")) if old_str in line]
             raise ToolError(f"匹配不唯一，出现在行：{lines}")
-        
-        # 执行替换并记录历史
-        new_content = current_content.replace(old_str_expanded, new_str_expanded)
+
+        # 切片拼接重建内容（匹配位置已知，无需replace再扫一遍）并记录历史
+        new_content = (
+            current_content[:idx]
+            + new_str_expanded
+            + current_content[idx + len(old_str_expanded):]
+        )
         self.write_file(path, new_content)
         self._file_history[path].append(current_content)
-        
-        # 生成编辑片段预览
-        replace_line = current_content.split(old_str_expanded)[0].count("\n")
+
+        # 生成编辑片段预览：有界count只数到匹配位置为止，
+        # 片段由匹配偏移为锚点就地截取，不再整文件split建行表
+        replace_line = current_content.count("\n", 0, idx)
         start = max(0, replace_line - SNIPPET_LINES)
         end = replace_line + SNIPPET_LINES + new_str.count("\n") if new_str else 0
-        snippet = "\n".join(new_content.split("\n")[start:end+1])
-        
+        snippet = self._snippet_around(new_content, idx, replace_line, end)
+
         return CLIResult(output=self._make_output(snippet, f"文件{path}的编辑片段", start+1) + "请确认修改是否符合预期，必要时可再次编辑")
 
+    @staticmethod
+    def _snippet_around(content: str, anchor: int, anchor_line: int, end_line: int) -> str:
+        """截取content中[max(0, anchor_line-SNIPPET_LINES), end_line]行的窗口
+
+        anchor是anchor_line行内的任意字符偏移。换行符只在窗口附近
+        前后扫描，代价为O(窗口行数)，结果等价于对整文件split("\n")
+        后切片再join，但不构建整张行表
+        """
+        start_line = max(0, anchor_line - SNIPPET_LINES)
+        if end_line < start_line:
+            return ""
+        # 从锚点回退到窗口首行的起点
+        pos = anchor
+        for _ in range(anchor_line - start_line + 1):
+            nl = content.rfind("\n", 0, pos)
+            if nl == -1:
+                pos = 0
+                break
+            pos = nl
+        else:
+            pos += 1  # 停在换行符上，起点在其后一位
+        win_start = pos
+        # 从窗口起点向前扫描到末行结束
+        pos = win_start
+        for _ in range(end_line - start_line + 1):
+            nl = content.find("\n", pos)
+            if nl == -1:
+                return content[win_start:]  # 窗口触及文件末尾
+            pos = nl + 1
+        return content[win_start:pos - 1]
+
     def insert(self, path: Path, insert_line: int, new_str: str) -> CLIResult:
         """实现指定行后插入内容功能"""
-        content = self.read_file(path).expandtabs()
+        content = _expand_tabs(self.read_file(path))
         lines = content.split("\n")
         if insert_line < 0 or insert_line > len(lines):
             raise ToolError(f"无效行号：{insert_line}，有效范围[0-{len(lines)}]")
         
         # 插入新内容并记录历史
-        new_lines = lines[:insert_line] + new_str.expandtabs().split("\n") + lines[insert_line:]
+        new_lines = lines[:insert_line] + _expand_tabs(new_str).split("\n") + lines[insert_line:]
         self.write_file(path, "\n".join(new_lines))
         self._file_history[path].append(content)
         
@@ -205,16 +311,39 @@ class StrReplaceEditor(BaseTool):
         return CLIResult(output=f"已撤销{path}的最后一次编辑")
 
     def read_file(self, path: Path) -> str:
-        """安全读取文件内容，捕获异常"""
+        """安全读取文件内容，捕获异常
+
+        编辑循环（view→str_replace→view）会对同一文件反复整读；
+        以(路径, mtime_ns, 大小)为键做小容量LRU缓存，文件未变更时直接命中
+        """
         try:
-            return path.read_text()
+            st = path.stat()
+            key = (str(path), st.st_mtime_ns, st.st_size)
+            cached = self._read_cache.get(key)
+            if cached is not None:
+                self._read_cache.move_to_end(key)  # 命中后移到队尾保持LRU序
+                return cached
+            try:
+                # 绕过文本层：不做locale编解码器查找与通用换行翻译，
+                # 对UTF-8源文件少走若干Python层包装
+                content = path.read_bytes().decode("utf-8")
+            except UnicodeDecodeError:
+                content = path.read_text()  # 罕见编码退回原读取路径
+            self._read_cache[key] = content
+            if len(self._read_cache) > READ_CACHE_SIZE:
+                self._read_cache.popitem(last=False)  # 淘汰最久未用的条目
+            return content
         except Exception as e:
             raise ToolError(f"读取文件失败：{path}，错误：{str(e)}")
 
     def write_file(self, path: Path, content: str):
         """安全写入文件内容，捕获异常"""
         try:
-            path.write_text(content)
+            path.write_bytes(content.encode("utf-8"))  # 同样绕过文本层直接写字节
+            # mtime粒度不足以区分快速连续写入，显式失效该路径的全部缓存
+            key_path = str(path)
+            for key in [k for k in self._read_cache if k[0] == key_path]:
+                del self._read_cache[key]
         except Exception as e:
             raise ToolError(f"写入文件失败：{path}，错误：{str(e)}")
 
@@ -228,6 +357,6 @@ class StrReplaceEditor(BaseTool):
         """生成带行号的文件内容展示"""
         truncated = maybe_truncate(content)
         if expand_tabs:
-            truncated = truncated.expandtabs()
+            truncated = _expand_tabs(truncated)
         numbered = "\n".join(f"{i+init_line:6}\t{line}" for i, line in enumerate(truncated.split("\n")))
         return f"文件{file_descriptor}的`cat -n`输出：\n{numbered}\n"
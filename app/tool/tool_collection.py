@@ -1,18 +1,49 @@
 """工具集合类，用于管理多个工具实例及其执行流程"""
-from typing import Any, Dict, List
+import asyncio
+import json  # 标准库JSON，作为orjson缺失时的后备编码器
+import sys
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+
+# 可用时选择C实现的orjson编码，输出与标准库等价的UTF-8字节串
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 from app.exceptions import ToolError
-from app.tool.base import BaseTool, ToolFailure, ToolResult
+from app.logger import logger
+from app.tool.base import BaseTool, ToolArgs, ToolFailure, ToolResult
+
+@lru_cache(maxsize=64)
+def _missing_tool(name: str) -> ToolFailure:
+    """同名未命中复用同一失败实例：模型幻觉出的工具名往往反复出现，
+    缓存后免去每次的字符串插值与pydantic模型构造；调用方只读结果"""
+    return ToolFailure(error=f"工具不存在：{name}")
 
 class ToolCollection:
     """工具集合管理类，提供工具注册、执行及批量操作功能"""
+
+    # 固定槽位取代实例__dict__：省内存，属性读取走描述符路径更快
+    __slots__ = ("tools", "tool_map", "_lookup", "_params_cache", "_params_json_cache")
+
     def __init__(self, *tools: BaseTool):
         """初始化工具集合
         Args:
             *tools: 需要注册的工具实例列表
         """
-        self.tools = tools  # 存储所有工具实例的元组
-        self.tool_map = {tool.name: tool for tool in tools}  # 工具名称到实例的快速查找字典
+        self.tools = list(tools)  # 存储所有工具实例；列表支持O(1)追加
+        # 键统一intern：查找时字符串比较走指针相等的短路分支
+        self.tool_map = {sys.intern(tool.name): tool for tool in tools}
+        # 预绑定dict.get：热路径每次分发省去self.tool_map两级属性查找；
+        # tool_map只原地增改、从不整体重赋值，绑定方法始终指向同一字典
+        self._lookup = self.tool_map.get
+        self._params_cache: Optional[List[Dict[str, Any]]] = None  # to_params结果缓存
+        self._params_json_cache: Optional[bytes] = None  # to_params_json结果缓存
 
     def __iter__(self):
         """实现迭代协议，允许直接遍历工具集合"""
@@ -23,44 +54,75 @@ class ToolCollection:
         Returns:
             每个工具的参数描述字典组成的列表
         """
-        return [tool.to_param() for tool in self.tools]
+        # 工具schema在两次add_tool之间不变，而本方法每轮LLM调用都会
+        # 执行一次：缓存结果，仅在注册新工具时失效
+        if self._params_cache is None:
+            self._params_cache = [tool.to_param() for tool in self.tools]
+        return self._params_cache
+
+    def to_params_json(self) -> bytes:
+        """获取全部工具schema的JSON字节串（缓存）
+        Returns:
+            编码为UTF-8 JSON的工具参数列表，注册新工具前保持不变
+
+        需要直接传输或持久化schema的调用方可用本方法跳过每轮的
+        JSON编码；经SDK发请求的路径仍消费to_params的字典列表
+        """
+        if self._params_json_cache is None:
+            self._params_json_cache = _dumps(self.to_params())
+        return self._params_json_cache
 
     async def execute(
-        self, *, name: str, tool_input: Dict[str, Any] = None
+        self, *, name: str, tool_input: Union[Dict[str, Any], ToolArgs] = None
     ) -> ToolResult:
         """执行指定名称的工具
         Args:
             name: 需要执行的工具名称
-            tool_input: 工具执行参数字典（可选）
+            tool_input: 工具执行参数字典或ToolArgs惰性包装（可选）
         Returns:
             工具执行结果对象（成功或失败状态）
         """
-        tool = self.tool_map.get(name)
+        tool = self._lookup(sys.intern(name))
         if not tool:
-            return ToolFailure(error=f"工具不存在：{name}")
+            return _missing_tool(name)
+        # ToolArgs包装到这里才真正解析；只转发原始文本的调用路径可完全跳过解码
+        if isinstance(tool_input, ToolArgs):
+            tool_input = tool_input.parsed
         try:
-            result = await tool(**(tool_input or {}))  # 使用默认空字典避免None错误
+            # 无参调用（terminate等）直接走普通调用路径，
+            # 省去每次为**展开临时分配的空字典
+            result = await (tool(**tool_input) if tool_input else tool())
             return result
         except ToolError as e:
             return ToolFailure(error=str(e))
 
     async def execute_all(self) -> List[ToolResult]:
-        """顺序执行所有工具并收集结果
+        """并发执行所有工具并收集结果
         Returns:
-            按执行顺序排列的工具结果列表
+            按注册顺序排列的工具结果列表
         """
-        results = []
-        for tool in self.tools:
-            try:
-                result = await tool()
-                results.append(result)
-            except ToolError as e:
-                results.append(ToolFailure(error=str(e)))
+        # gather并发启动全部工具，IO等待相互重叠：总耗时从各工具耗时
+        # 之和降为其中最大值；结果顺序由gather保证与注册顺序一致
+        raw = await asyncio.gather(
+            *(tool() for tool in self.tools), return_exceptions=True
+        )
+        # 结果数已知，预分配后按位写入，免去append途中的多次扩容
+        results: List[ToolResult] = [None] * len(raw)
+        for i, (tool, outcome) in enumerate(zip(self.tools, raw)):
+            if isinstance(outcome, ToolError):
+                results[i] = ToolFailure(error=str(outcome))
+            elif isinstance(outcome, BaseException):
+                # 未知异常不再中止整批：记录堆栈后降级为失败结果，
+                # 其余工具的结果得以保留，避免瞬时故障导致整批重跑
+                logger.error(f"工具{tool.name}执行异常：{outcome!r}")
+                results[i] = ToolFailure(error=f"意外异常：{outcome!r}")
+            else:
+                results[i] = outcome
         return results
 
     def get_tool(self, name: str) -> BaseTool:
         """通过名称获取工具实例"""
-        return self.tool_map.get(name)
+        return self._lookup(name)
 
     def add_tool(self, tool: BaseTool):
         """添加单个工具到集合
@@ -69,8 +131,11 @@ class ToolCollection:
         Returns:
             自身实例，支持链式调用
         """
-        self.tools += (tool,)  # 元组追加需保持元组类型
-        self.tool_map[tool.name] = tool
+        # 原先tuple拼接每次整体复制、批量注册呈平方级；列表追加均摊O(1)
+        self.tools.append(tool)
+        self.tool_map[sys.intern(tool.name)] = tool
+        self._params_cache = None  # 工具集变化，下次to_params重建
+        self._params_json_cache = None
         return self
 
     def add_tools(self, *tools: BaseTool):
@@ -1,6 +1,14 @@
 # 导入必要的模块
 import asyncio  # 用于异步编程的Python库
 
+# 可选加速：uvloop以libuv实现事件循环，回调/定时器调度开销
+# 显著低于纯Python的默认循环；未安装时静默使用默认实现
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 # 导入自定义模块
 from app.agent.manus import Manus  # 主代理类，负责处理用户请求
 from app.logger import logger  # 自定义日志记录器，用于输出运行状态信息
@@ -8,12 +16,13 @@ from app.logger import logger  # 自定义日志记录器，用于输出运行
 # 主异步函数定义
 async def main():
     """程序核心入口，负责初始化代理并处理用户输入"""
-    # 初始化Manus代理实例
-    agent = Manus()  # 创建代理对象以处理用户请求
-
     try:
-        # 获取用户输入的提示信息
-        prompt = input("Enter your prompt: ")  # 通过命令行读取用户输入的提示内容
+        # 读输入与建代理并发进行：input放到线程避免阻塞事件循环，
+        # Manus初始化（工具装配、客户端创建）与用户打字的时间重叠
+        prompt, agent = await asyncio.gather(
+            asyncio.to_thread(input, "Enter your prompt: "),
+            asyncio.to_thread(Manus),
+        )
 
         # 检查输入内容是否为空
         if not prompt.strip():  # 去除首尾空白后判断是否为空字符串
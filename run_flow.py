@@ -2,47 +2,81 @@
 import asyncio  # 提供异步IO和事件循环功能
 import time     # 用于时间测量和延迟控制
 
+# 可选加速：uvloop以libuv实现事件循环，回调/定时器调度开销
+# 显著低于纯Python的默认循环；未安装时静默使用默认实现
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 # 导入自定义模块
 from app.agent.manus import Manus  # 负责处理用户请求的主代理类
 from app.flow.base import FlowType  # 定义流程类型的枚举类
 from app.flow.flow_factory import FlowFactory  # 根据类型创建流程实例的工厂类
 from app.logger import logger  # 自定义日志记录器，用于输出运行状态信息
+from app.schema import AgentState, Memory  # 每轮重置会话态所需的数据结构
 
 # 主异步函数，负责协调流程执行
 async def run_flow():
-    """协调代理与流程的执行，处理用户输入并监控执行过程"""
-    # 初始化代理集合字典，键为代理名称，值为代理实例
-    agents = {
-        "manus": Manus(),  # 存储主代理实例供流程调用
-    }
-
-    try:
-        # 从命令行获取用户输入的提示内容
-        prompt = input("Enter your prompt: ")  # 阻塞式等待用户输入
-
-        # 验证输入有效性：检查是否为空或仅包含空白字符
-        if prompt.strip() == "" or prompt.isspace():
-            logger.warning("Empty prompt provided.")
-            return  # 输入无效时直接退出函数
+    """协调代理与流程的执行，循环处理用户输入并监控执行过程
 
-        # 通过工厂模式创建指定类型的流程实例
-        flow = FlowFactory.create_flow(
-            flow_type=FlowType.PLANNING,  # 选择规划类型流程
-            agents=agents,                # 传入代理集合供流程调用
-        )
-        logger.warning("Processing your request...")  # 输出处理开始提示
+    代理只构造一次并跨提示复用：LLM客户端、工具装配与schema生成等
+    冷启动开销仅在首轮支付；每轮执行前换上隔离的会话态副本
+    """
+    manus = None  # 首轮与读输入并发构造，之后复用
 
+    while True:
         try:
-            # 记录流程开始时间
-            start_time = time.time()  # 获取当前时间戳
+            if manus is None:
+                # 读输入与建代理并发进行：input放到线程避免阻塞事件循环，
+                # Manus初始化与用户打字的时间重叠
+                prompt, manus = await asyncio.gather(
+                    asyncio.to_thread(input, "Enter your prompt: "),
+                    asyncio.to_thread(Manus),
+                )
+            else:
+                prompt = await asyncio.to_thread(input, "Enter your prompt: ")
+        except (EOFError, KeyboardInterrupt):  # Ctrl+D/Ctrl+C退出交互循环
+            logger.info("Operation cancelled by user.")
+            return
+
+        # 验证输入有效性：strip后为假即覆盖空串与纯空白两种情况，
+        # 原先的isspace()分支是多余的第二趟扫描
+        if not prompt.strip():
+            logger.warning("Empty prompt provided.")
+            continue  # 输入无效时等待下一条提示
+
+        # 复用execute_batch的隔离方式：重资源共享，会话态（内存/
+        # 状态/步数）全新，保证两次提示之间互不污染对话历史
+        agents = {
+            "manus": manus.model_copy(
+                update={
+                    "memory": Memory(),
+                    "state": AgentState.IDLE,
+                    "current_step": 0,
+                }
+            ),
+        }
 
-            # 执行流程并设置超时监控（1小时）
-            result = await asyncio.wait_for(
-                flow.execute(prompt),  # 执行流程的主逻辑，传入用户输入
-                timeout=3600,          # 超时阈值设为3600秒（60分钟）
+        try:
+            # 通过工厂模式创建指定类型的流程实例
+            flow = FlowFactory.create_flow(
+                flow_type=FlowType.PLANNING,  # 选择规划类型流程
+                agents=agents,                # 传入代理集合供流程调用
             )
+            logger.warning("Processing your request...")  # 输出处理开始提示
+
+            # 记录流程开始时间：perf_counter单调且分辨率更高，
+            # 不受NTP校时影响，是测量时间间隔的推荐时钟
+            start_time = time.perf_counter()
+
+            # 执行流程并设置超时监控（1小时）；timeout()上下文管理器
+            # 原地监督协程，比wait_for少一层包装Task，取消链也更直接
+            async with asyncio.timeout(3600):  # 超时阈值设为3600秒（60分钟）
+                result = await flow.execute(prompt)  # 执行流程的主逻辑，传入用户输入
             # 计算并记录执行耗时
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.perf_counter() - start_time
             logger.info(f"Request processed in {elapsed_time:.2f} seconds")
             logger.info(result)  # 输出流程最终结果
 
@@ -52,11 +86,11 @@ async def run_flow():
                 "Operation terminated due to timeout. "  # 超时提示信息
                 "Please try a simpler request."
             )
-
-    except KeyboardInterrupt:  # 捕获用户手动中断（Ctrl+C）
-        logger.info("Operation cancelled by user.")
-    except Exception as e:  # 捕获其他未知异常
-        logger.error(f"Error: {str(e)}")  # 记录异常信息
+        except KeyboardInterrupt:  # 捕获用户手动中断（Ctrl+C）
+            logger.info("Operation cancelled by user.")
+            return
+        except Exception as e:  # 捕获其他未知异常
+            logger.error(f"Error: {str(e)}")  # 记录异常信息
 
 # 程序入口判断
 if __name__ == "__main__":  # 确保仅在直接运行此文件时执行